@@ -6,7 +6,6 @@ Extracts SSIDs, VLANs, and other common objects from XIQ and posts to Edge Servi
 
 import argparse
 import sys
-import json
 import getpass
 from pathlib import Path
 from src.xiq_parser import XIQParser
@@ -14,6 +13,13 @@ from src.xiq_api_client import XIQAPIClient
 from src.campus_controller_client import CampusControllerClient
 from src.config_converter import ConfigConverter
 from src.export_utils import export_to_json, export_all_to_csv
+from src.json_codec import dump_file, dumps
+from src.xiq_snapshot_diff import load_snapshot, print_diff_summary
+from src.bulk_extractor import BulkExtractor, load_manifest
+from src.token_cache import TokenCache
+from src.endpoint_cache import EndpointCache
+from src.api_stats import APIStats
+from src.migration_journal import MigrationJournal
 
 
 def print_banner():
@@ -357,6 +363,57 @@ def select_profile_assignments(services, profiles, assume_yes=False):
     return assignments
 
 
+def retrieve_xiq_configuration(xiq_client, diff_snapshot=None, network_policy_id=None):
+    """
+    Retrieve configuration and devices from XIQ
+
+    Args:
+        xiq_client: Connected XIQAPIClient
+        diff_snapshot: Optional previous --export-json snapshot to diff against
+        network_policy_id: Only retrieve the objects this network policy uses
+
+    Returns:
+        XIQ configuration dictionary (with a 'snapshot_diff' entry when diff_snapshot is set)
+    """
+    print("Retrieving configuration and device information from XIQ...")
+    if network_policy_id is not None:
+        print(f"  Limited to network policy {network_policy_id}")
+    if not diff_snapshot:
+        # Devices (APs) provide names and locations
+        return xiq_client.get_configuration(network_policy_id, include_devices=True)
+
+    print(f"  Comparing against snapshot {diff_snapshot}")
+    previous = load_snapshot(diff_snapshot)
+    xiq_config = xiq_client.get_configuration_diff(previous, include_devices=True,
+                                                   network_policy_id=network_policy_id)
+    print("\nChanges since previous snapshot:")
+    print_diff_summary(xiq_config['snapshot_diff'])
+    return xiq_config
+
+
+def run_bulk_extraction(args, api_stats=None):
+    """
+    Extract every tenant listed in a bulk manifest
+
+    Args:
+        args: Parsed command-line arguments (uses bulk_manifest, bulk_output_dir)
+        api_stats: Optional APIStats shared by all tenant clients (--stats-file)
+
+    Returns:
+        True if every tenant was extracted
+    """
+    tenants = load_manifest(args.bulk_manifest)
+    print(f"Extracting {len(tenants)} XIQ tenants from {args.bulk_manifest}...")
+
+    extractor = BulkExtractor(verbose=args.verbose, compact=args.compact, stats=api_stats,
+                              endpoint_cache=EndpointCache() if args.cache_endpoints else None)
+    summary = extractor.run(tenants, args.bulk_output_dir)
+
+    print(f"\n✓ {summary['succeeded']}/{len(tenants)} tenants extracted in {summary['total_seconds']}s")
+    print(f"  Snapshots and summary.json written to {args.bulk_output_dir}")
+    return summary['failed'] == 0
+
+
 def select_objects_to_migrate(xiq_config):
     """
     Interactive selection of which objects to migrate
@@ -606,6 +663,11 @@ Examples:
         type=str,
         help='Export raw XIQ configuration to JSON file'
     )
+    parser.add_argument(
+        '--minify-json',
+        action='store_true',
+        help='Write --output and --export-json files without indentation (smaller and faster for large tenants)'
+    )
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -616,13 +678,90 @@ Examples:
         action='store_true',
         help='Skip interactive selection and migrate all objects'
     )
+    parser.add_argument(
+        '--update-existing',
+        action='store_true',
+        help='Update Edge Services objects that already exist (same name or VLAN) instead of skipping them'
+    )
+    parser.add_argument(
+        '--journal',
+        type=str,
+        help='Append every completed Edge Services operation to this JSONL journal'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='With --journal, skip operations the journal records as completed (resume an interrupted migration)'
+    )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Keep XIQ objects as compact records without raw API payloads (lower memory on large tenants)'
+    )
+    parser.add_argument(
+        '--raw-store',
+        type=str,
+        help='With --compact, spill raw XIQ payloads to this file so they stay available on demand'
+    )
+    parser.add_argument(
+        '--checkpoint-dir',
+        type=str,
+        help='Checkpoint each downloaded XIQ page to this directory; re-running with the same directory resumes an interrupted extraction'
+    )
+    parser.add_argument(
+        '--network-policy-id',
+        type=int,
+        help='Only migrate the SSIDs, user profiles, VLANs and RADIUS servers used by this XIQ network policy'
+    )
+    parser.add_argument(
+        '--diff-snapshot',
+        type=str,
+        help='Previous --export-json snapshot; after the (full) extraction, report which XIQ objects were added, '
+             'changed or removed since then'
+    )
+    parser.add_argument(
+        '--cache-token',
+        action='store_true',
+        help='Reuse a still-valid XIQ login token from an encrypted local cache (requires the cryptography package)'
+    )
+    parser.add_argument(
+        '--cache-endpoints',
+        action='store_true',
+        help='Remember which RADIUS endpoint works for each XIQ tenant in a local cache file, so later runs skip probing'
+    )
+    parser.add_argument(
+        '--stats-file',
+        type=str,
+        help='Write per-endpoint API statistics (requests, latency histogram, bytes, retries, status codes) to this JSON file'
+    )
+    parser.add_argument(
+        '--bulk-manifest',
+        type=str,
+        help='JSON manifest of XIQ tenants (name, region, token/token_env or username/password) to extract in one run'
+    )
+    parser.add_argument(
+        '--bulk-output-dir',
+        type=str,
+        default='xiq_snapshots',
+        help='Directory for per-tenant snapshots and summary.json from --bulk-manifest. Default: xiq_snapshots'
+    )
 
     args = parser.parse_args()
 
+    if args.resume and not args.journal:
+        parser.error('--resume requires --journal')
+
+    # One stats object shared by the XIQ and Edge Services clients
+    api_stats = APIStats() if args.stats_file else None
+
     try:
         # Print banner
         print_banner()
 
+        # Bulk mode: extract many tenants and stop (no conversion or posting)
+        if args.bulk_manifest:
+            sys.exit(0 if run_bulk_extraction(args, api_stats) else 1)
+
         # Determine if we're in interactive mode or command-line mode
         interactive_mode = not (args.input_file or args.xiq_token or args.xiq_username)
 
@@ -663,6 +802,7 @@ Examples:
                 }
 
         # Get configuration from XIQ
+        xiq_client = None
         if xiq_creds['type'] == 'file':
             # Read from file
             input_path = Path(xiq_creds['file_path'])
@@ -683,17 +823,17 @@ Examples:
                 username=xiq_creds['username'],
                 password=xiq_creds['password'],
                 base_url=xiq_creds['region_url'],
-                verbose=args.verbose
+                verbose=args.verbose,
+                token_cache=TokenCache(verbose=args.verbose) if args.cache_token else None,
+                stats=api_stats,
+                compact=args.compact,
+                raw_store_path=args.raw_store,
+                checkpoint_dir=args.checkpoint_dir,
+                endpoint_cache=EndpointCache() if args.cache_endpoints else None
             )
 
             print("\n✓ Authentication successful")
-            print("Retrieving configuration from XIQ...")
-            xiq_config = xiq_client.get_configuration()
-
-            # Fetch devices (APs) to get names and locations
-            print("Retrieving device information...")
-            devices = xiq_client.get_devices()
-            xiq_config['devices'] = devices
+            xiq_config = retrieve_xiq_configuration(xiq_client, args.diff_snapshot, args.network_policy_id)
 
         elif xiq_creds['type'] == 'token':
             # Use API token
@@ -703,7 +843,12 @@ Examples:
             xiq_client = XIQAPIClient(
                 api_token=xiq_creds['token'],
                 base_url=xiq_creds['region_url'],
-                verbose=args.verbose
+                verbose=args.verbose,
+                stats=api_stats,
+                compact=args.compact,
+                raw_store_path=args.raw_store,
+                checkpoint_dir=args.checkpoint_dir,
+                endpoint_cache=EndpointCache() if args.cache_endpoints else None
             )
 
             if not xiq_client.test_connection():
@@ -711,13 +856,12 @@ Examples:
                 sys.exit(1)
 
             print("\n✓ Connection successful")
-            print("Retrieving configuration from XIQ...")
-            xiq_config = xiq_client.get_configuration()
+            xiq_config = retrieve_xiq_configuration(xiq_client, args.diff_snapshot, args.network_policy_id)
 
-            # Fetch devices (APs) to get names and locations
-            print("Retrieving device information...")
-            devices = xiq_client.get_devices()
-            xiq_config['devices'] = devices
+        if xiq_client and xiq_client.checkpoints:
+            checkpoints = xiq_client.checkpoints
+            print(f"\n  Checkpoints ({checkpoints.run_dir}): {checkpoints.pages_loaded} pages resumed, "
+                  f"{checkpoints.pages_saved} pages downloaded")
 
         # Show what was extracted
         print("\n✓ Configuration retrieved from XIQ")
@@ -738,7 +882,7 @@ Examples:
         # Export raw XIQ config if requested
         if args.export_json:
             print(f"\nExporting raw XIQ configuration to {args.export_json}...")
-            export_to_json(xiq_config, args.export_json)
+            export_to_json(xiq_config, args.export_json, pretty=not args.minify_json)
             print(f"✓ Raw XIQ configuration saved to {args.export_json}")
 
         # Export to CSV if requested
@@ -791,7 +935,8 @@ Examples:
                     cc_info['url'],
                     cc_info['username'],
                     cc_info['password'],
-                    verbose=args.verbose
+                    verbose=args.verbose,
+                    stats=api_stats
                 )
                 print("✓ Connected to Edge Services")
 
@@ -817,8 +962,7 @@ Examples:
         # Save to file if requested
         if args.output:
             print(f"\nSaving converted configuration to {args.output}...")
-            with open(args.output, 'w') as f:
-                json.dump(campus_config, f, indent=2)
+            dump_file(campus_config, args.output, pretty=not args.minify_json)
             print("✓ Configuration saved successfully")
 
         # STEP 3: Post to Edge Services
@@ -841,14 +985,20 @@ Examples:
                     save_output = confirm_action("Would you like to save the converted configuration to a file?")
                     if save_output:
                         output_file = input("Output filename [campus_config.json]: ").strip() or "campus_config.json"
-                        with open(output_file, 'w') as f:
-                            json.dump(campus_config, f, indent=2)
+                        dump_file(campus_config, output_file, pretty=not args.minify_json)
                         print(f"✓ Configuration saved to {output_file}")
                 sys.exit(0)
 
             print("\nPosting configuration...")
 
-            result = controller_client.post_configuration(campus_config)
+            journal = MigrationJournal(args.journal, resume=args.resume, verbose=args.verbose) if args.journal else None
+            try:
+                result = controller_client.post_configuration(campus_config, update_existing=args.update_existing,
+                                                              journal=journal)
+            finally:
+                if journal is not None:
+                    journal.close()
+                    print(f"  Journal: {args.journal}")
 
             if result['success']:
                 print("\n" + "=" * 70)
@@ -883,37 +1033,9 @@ Examples:
                             print("Applying profile assignments...")
                             print("-" * 70)
 
-                            success_count = 0
                             total_count = sum(len(v) for v in profile_assignments.values())
-
-                            for service_id, assignments in profile_assignments.items():
-                                # Find service name
-                                service_name = next(
-                                    (s.get('serviceName') for s in campus_config['services'] if s.get('id') == service_id),
-                                    'Unknown'
-                                )
-
-                                # Group assignments by profile
-                                profile_groups = {}
-                                for assignment in assignments:
-                                    profile_id = assignment['profile_id']
-                                    if profile_id not in profile_groups:
-                                        profile_groups[profile_id] = {
-                                            'profile_name': assignment['profile_name'],
-                                            'ssid_assignments': []
-                                        }
-                                    profile_groups[profile_id]['ssid_assignments'].append({
-                                        'serviceId': service_id,
-                                        'index': assignment['radio_index']
-                                    })
-
-                                # Update each profile
-                                for profile_id, group in profile_groups.items():
-                                    if args.verbose:
-                                        print(f"\n  Assigning '{service_name}' to profile '{group['profile_name']}'...")
-
-                                    if controller_client.update_profile_ssid_assignments(profile_id, group['ssid_assignments']):
-                                        success_count += len(group['ssid_assignments'])
+                            # One GET + PUT per profile, covering every service assigned to it
+                            success_count = controller_client.apply_profile_assignments(profile_assignments)
 
                             print(f"\n✓ Applied {success_count}/{total_count} profile assignments")
                         else:
@@ -938,7 +1060,7 @@ Examples:
             print("-" * 70)
             if not args.output:
                 print("\nConverted configuration preview (first 500 characters):")
-                print(json.dumps(campus_config, indent=2)[:500] + "...")
+                print(dumps(campus_config, pretty=True)[:500] + "...")
 
         print("\n" + "=" * 70)
         print("✓ Process completed successfully!")
@@ -957,6 +1079,12 @@ Examples:
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        if api_stats is not None:
+            api_stats.dump(args.stats_file)
+            if args.verbose:
+                api_stats.print_summary()
+            print(f"\nAPI statistics saved to {args.stats_file}")
 
 
 if __name__ == '__main__':
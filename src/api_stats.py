@@ -0,0 +1,159 @@
+"""
+API Statistics
+Per-endpoint request counts, latency histograms, payload sizes, retries and
+status codes for the XIQ and Edge Services clients
+"""
+
+import re
+import threading
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+try:
+    from .json_codec import dump_file
+except ImportError:
+    from json_codec import dump_file
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_UUID_SEGMENT = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+# All-digit ids (XIQ object ids, numeric AP serials) and Edge Services AP serials such as 1234Y-10009
+_ID_SEGMENT = re.compile(r'^\d+$|^\d{4}[A-Z]-\d{4,}$')
+
+
+def endpoint_template(url_or_path: str) -> str:
+    """
+    Collapse object ids in a URL path so requests group per endpoint
+
+    '/management/v1/aps/1234Y-10009' -> '/management/v1/aps/{id}'
+    '/v3/profiles/6d7c...-...'       -> '/v3/profiles/{id}'
+    '/management/v1/oauth2/token'    -> unchanged
+    """
+    path = urlsplit(url_or_path).path or url_or_path
+    segments = []
+    for segment in path.split('/'):
+        if _UUID_SEGMENT.match(segment) or _ID_SEGMENT.match(segment):
+            segment = '{id}'
+        segments.append(segment)
+    return '/'.join(segments)
+
+
+class _EndpointStats:
+    """Counters for one method + endpoint template"""
+
+    __slots__ = ('requests', 'errors', 'retries', 'total_seconds', 'min_seconds', 'max_seconds',
+                 'bytes_received', 'bytes_sent', 'status_codes', 'histogram')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.min_seconds = None
+        self.max_seconds = 0.0
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.status_codes: Dict[str, int] = {}
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'total_seconds': round(self.total_seconds, 4),
+            'avg_seconds': round(self.total_seconds / self.requests, 4) if self.requests else 0.0,
+            'min_seconds': round(self.min_seconds or 0.0, 4),
+            'max_seconds': round(self.max_seconds, 4),
+            'bytes_received': self.bytes_received,
+            'bytes_sent': self.bytes_sent,
+            'status_codes': dict(sorted(self.status_codes.items())),
+            'latency_histogram': dict(zip(labels, self.histogram))
+        }
+
+
+class APIStats:
+    """
+    Thread-safe request statistics, grouped by method and endpoint template
+
+    One instance can be shared by several clients (e.g. the XIQ and Edge
+    Services clients of one run) to get a single report.
+    """
+
+    def __init__(self):
+        self._endpoints: Dict[tuple, _EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, method: str, endpoint: str) -> _EndpointStats:
+        key = (method.upper(), endpoint_template(endpoint))
+        entry = self._endpoints.get(key)
+        if entry is None:
+            entry = self._endpoints[key] = _EndpointStats()
+        return entry
+
+    def record(self, method: str, endpoint: str, status: Optional[int], seconds: float,
+               bytes_received: int = 0, bytes_sent: int = 0, retry: bool = False):
+        """
+        Record one HTTP request
+
+        Args:
+            method: HTTP method
+            endpoint: Request URL or path (ids are collapsed by endpoint_template)
+            status: HTTP status code, or None if no response was received
+            seconds: Time from sending the request to receiving the body
+            bytes_received: Response body size
+            bytes_sent: Request body size
+            retry: Whether this request repeats an earlier attempt
+        """
+        bucket = len(LATENCY_BUCKETS)
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                bucket = index
+                break
+
+        status_key = str(status) if status is not None else 'error'
+        with self._lock:
+            entry = self._entry(method, endpoint)
+            entry.requests += 1
+            entry.retries += 1 if retry else 0
+            entry.errors += 1 if status is None or status >= 400 else 0
+            entry.total_seconds += seconds
+            entry.min_seconds = seconds if entry.min_seconds is None else min(entry.min_seconds, seconds)
+            entry.max_seconds = max(entry.max_seconds, seconds)
+            entry.bytes_received += bytes_received
+            entry.bytes_sent += bytes_sent
+            entry.status_codes[status_key] = entry.status_codes.get(status_key, 0) + 1
+            entry.histogram[bucket] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return all statistics, slowest endpoint (by total time) first
+
+        Returns:
+            {'totals': {...}, 'endpoints': [{'method', 'endpoint', ...counters}]}
+        """
+        with self._lock:
+            endpoints = [dict(method=method, endpoint=endpoint, **entry.to_dict())
+                         for (method, endpoint), entry in self._endpoints.items()]
+        endpoints.sort(key=lambda e: e['total_seconds'], reverse=True)
+
+        totals = {key: sum(e[key] for e in endpoints)
+                  for key in ('requests', 'errors', 'retries', 'bytes_received', 'bytes_sent')}
+        totals['total_seconds'] = round(sum(e['total_seconds'] for e in endpoints), 4)
+        return {'totals': totals, 'endpoints': endpoints}
+
+    def dump(self, output_file: str):
+        """Write the statistics to a JSON file"""
+        dump_file(self.to_dict(), output_file)
+
+    def print_summary(self, top: int = 10):
+        """Print the endpoints that took the most total time"""
+        stats = self.to_dict()
+        totals = stats['totals']
+        print(f"\nAPI statistics: {totals['requests']} requests, {totals['retries']} retries, "
+              f"{totals['errors']} errors, {totals['bytes_received'] / 1e6:.1f} MB received")
+        for entry in stats['endpoints'][:top]:
+            print(f"  {entry['method']:6} {entry['endpoint']:50} {entry['requests']:6} req "
+                  f"{entry['total_seconds']:9.2f}s total {entry['avg_seconds'] * 1000:8.1f}ms avg")
@@ -0,0 +1,538 @@
+"""
+Async XIQ API Client
+asyncio counterpart of XIQAPIClient built on aiohttp, so hundreds of page and
+collection requests can be in flight on a single thread
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Any, Optional, Awaitable
+
+try:
+    import aiohttp
+except ImportError:
+    # aiohttp is optional - only needed for the async client
+    aiohttp = None
+
+# Shared login parsing and normalization helpers
+try:
+    from .xiq_api_client import XIQAPIClient, IncompleteCollection, IncompleteExtractionError, \
+        USER_PROFILE_REFERENCE_KEYS, RADIUS_CLIENT_REFERENCE_KEYS, RADIUS_SERVER_REFERENCE_KEYS
+except ImportError:
+    from xiq_api_client import XIQAPIClient, IncompleteCollection, IncompleteExtractionError, \
+        USER_PROFILE_REFERENCE_KEYS, RADIUS_CLIENT_REFERENCE_KEYS, RADIUS_SERVER_REFERENCE_KEYS
+
+try:
+    from .api_stats import APIStats
+except ImportError:
+    from api_stats import APIStats
+
+try:
+    from .json_codec import loads
+except ImportError:
+    from json_codec import loads
+
+try:
+    from .request_scheduler import RateLimitScheduler
+except ImportError:
+    from request_scheduler import RateLimitScheduler
+
+try:
+    from .endpoint_cache import EndpointCache, tenant_key
+except ImportError:
+    from endpoint_cache import EndpointCache, tenant_key
+
+# Import configuration constants
+try:
+    from .config import MAX_PAGINATION_PAGES, DEFAULT_API_TIMEOUT, DEFAULT_PAGE_LIMIT, XIQ_PAGE_CONCURRENCY, XIQ_ASYNC_MAX_CONNECTIONS, XIQ_DEVICE_QUERY, \
+        XIQ_RADIUS_ENDPOINTS, XIQ_TOKEN_CHECK_ENDPOINT, XIQ_MAX_RETRIES
+except ImportError:
+    # Fallback if config.py doesn't exist
+    MAX_PAGINATION_PAGES = 100
+    DEFAULT_API_TIMEOUT = 30
+    DEFAULT_PAGE_LIMIT = 100
+    XIQ_PAGE_CONCURRENCY = 8
+    XIQ_ASYNC_MAX_CONNECTIONS = 100
+    XIQ_DEVICE_QUERY = {}
+    XIQ_RADIUS_ENDPOINTS = ['/radius-servers/external', '/radius-servers', '/aaa-servers']
+    XIQ_TOKEN_CHECK_ENDPOINT = '/network-policies?page=1&limit=1'
+    XIQ_MAX_RETRIES = 5
+
+
+class AsyncXIQAPIClient:
+    """
+    asyncio client for Extreme Cloud IQ API
+
+    Exposes the same public methods as XIQAPIClient as coroutines. Use it as an
+    async context manager so the underlying connection pool is closed:
+
+        async with await AsyncXIQAPIClient.login(username, password) as client:
+            config = await client.get_configuration(include_devices=True)
+    """
+
+    def __init__(self, api_token: str, base_url: str = "https://api.extremecloudiq.com", verify_ssl: bool = True, verbose: bool = False,
+                 page_concurrency: int = XIQ_PAGE_CONCURRENCY, max_connections: int = XIQ_ASYNC_MAX_CONNECTIONS,
+                 stats: Optional[APIStats] = None, endpoint_cache: Optional[EndpointCache] = None):
+        """
+        Initialize async XIQ API client with existing API token
+
+        Args:
+            api_token: XIQ API token (from XIQ Global Settings > API Token Management)
+            base_url: API base URL (default: https://api.extremecloudiq.com)
+            verify_ssl: Whether to verify SSL certificates
+            verbose: Enable verbose logging
+            page_concurrency: Maximum number of pages of one collection fetched in parallel
+            max_connections: Maximum number of simultaneous connections for this client
+            stats: APIStats to record requests in; a new one is created otherwise
+            endpoint_cache: Optional EndpointCache remembering which endpoint variants work for this tenant
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncXIQAPIClient requires aiohttp (pip install aiohttp)")
+
+        self.base_url = base_url
+        self.verify_ssl = verify_ssl
+        self.verbose = verbose
+        self.page_concurrency = max(1, page_concurrency)
+        self.max_connections = max_connections
+        self.stats = stats if stats is not None else APIStats()
+        self.headers = {
+            "Authorization": f"Bearer {api_token}",
+            "Content-Type": "application/json"
+        }
+        self.tenant = tenant_key(api_token, base_url)
+        self.endpoint_cache = endpoint_cache
+        # Paces all requests below XIQ's rate limit (shared logic with the sync client)
+        self.scheduler = RateLimitScheduler(verbose=verbose)
+        # Collections cut short by failed pages during the current get_configuration()
+        self.incomplete_collections: set = set()
+        # Created on first use so it binds to the running event loop
+        self._session: Optional["aiohttp.ClientSession"] = None
+        # Collection downloads shared within one get_configuration() call
+        self._collection_tasks: Optional[Dict[tuple, "asyncio.Task"]] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Return the aiohttp session, creating it inside the running loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ssl=None if self.verify_ssl else False)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=DEFAULT_API_TIMEOUT)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the underlying connection pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @classmethod
+    async def login(cls, username: str, password: str, base_url: str = "https://api.extremecloudiq.com", verify_ssl: bool = True, verbose: bool = False,
+                    page_concurrency: int = XIQ_PAGE_CONCURRENCY, max_connections: int = XIQ_ASYNC_MAX_CONNECTIONS,
+                    token_cache=None, use_cached_token: bool = True, stats: Optional[APIStats] = None,
+                    endpoint_cache: Optional[EndpointCache] = None):
+        """
+        Authenticate with username and password to get access token
+
+        Args:
+            username: ExtremeCloud IQ username (email)
+            password: ExtremeCloud IQ password
+            base_url: API base URL (default: https://api.extremecloudiq.com)
+            verify_ssl: Whether to verify SSL certificates
+            verbose: Enable verbose logging
+            page_concurrency: Maximum number of pages of one collection fetched in parallel
+            max_connections: Maximum number of simultaneous connections for this client
+            token_cache: Optional TokenCache; a cached token that XIQ still accepts skips the /login call
+            use_cached_token: Set to False to always verify the password with /login
+            stats: APIStats to record requests in; a new one is created otherwise
+            endpoint_cache: Optional EndpointCache remembering which endpoint variants work for this tenant
+
+        Returns:
+            AsyncXIQAPIClient instance
+
+        Raises:
+            Exception: If authentication fails
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncXIQAPIClient requires aiohttp (pip install aiohttp)")
+
+        if verbose:
+            print("  Authenticating to ExtremeCloud IQ...")
+
+        username, password = XIQAPIClient._clean_credentials(username, password)
+
+        cached_token = token_cache.get(username, password, base_url) if token_cache and use_cached_token else None
+
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+                if cached_token:
+                    async with session.get(
+                        f"{base_url}{XIQ_TOKEN_CHECK_ENDPOINT}",
+                        headers={'Authorization': f'Bearer {cached_token}', 'Accept': 'application/json'},
+                        ssl=None if verify_ssl else False
+                    ) as response:
+                        accepted = response.status < 400
+                    if accepted:
+                        if verbose:
+                            print("  ✓ Using cached access token")
+                        return cls(cached_token, base_url, verify_ssl, verbose, page_concurrency=page_concurrency,
+                                   max_connections=max_connections, stats=stats, endpoint_cache=endpoint_cache)
+                    token_cache.invalidate(username, password, base_url)
+                    if verbose:
+                        print("  ⚠ Cached access token was rejected - logging in again")
+
+                async with session.post(
+                    f"{base_url}/login",
+                    json={"username": username, "password": password},
+                    headers={'Content-Type': 'application/json'},
+                    ssl=None if verify_ssl else False
+                ) as response:
+                    text = await response.text()
+                    access_token = XIQAPIClient._parse_login_response(response.status, text)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise Exception(f"Connection error: {str(e) or type(e).__name__}")
+
+        if token_cache:
+            token_cache.put(username, password, base_url, access_token)
+
+        if verbose:
+            print("  ✓ Authentication successful")
+
+        return cls(access_token, base_url, verify_ssl, verbose, page_concurrency=page_concurrency,
+                   max_connections=max_connections, stats=stats, endpoint_cache=endpoint_cache)
+
+    async def _make_request(self, endpoint: str, method: str = "GET", params: dict = None) -> Optional[Any]:
+        """
+        Make an API request, returning the decoded JSON or None on error
+
+        Every call is paced by the client's RateLimitScheduler; throttled
+        responses (429/503) are retried after Retry-After up to XIQ_MAX_RETRIES times.
+        """
+        url = f"{self.base_url}{endpoint}"
+
+        try:
+            for attempt in range(XIQ_MAX_RETRIES + 1):
+                await self.scheduler.acquire_async()
+                started = time.perf_counter()
+                status, body = None, b''
+                try:
+                    async with self._get_session().request(method, url, params=params) as response:
+                        status = response.status
+                        body = await response.read()
+                finally:
+                    self.stats.record(method, endpoint, status, time.perf_counter() - started,
+                                      bytes_received=len(body), retry=attempt > 0)
+                self.scheduler.observe(response.headers)
+                if status not in (429, 503) or attempt == XIQ_MAX_RETRIES:
+                    break
+                self.scheduler.throttled(response.headers.get('Retry-After'), attempt)
+
+            response.raise_for_status()
+            return loads(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            if self.verbose:
+                print(f"  Error fetching {endpoint}: {e}")
+            return None
+
+    async def _fetch_page(self, endpoint: str, page: int, params: Optional[dict] = None) -> Optional[Any]:
+        """Fetch a single page of a paginated collection"""
+        params = dict(params or {}, page=page, limit=DEFAULT_PAGE_LIMIT)
+        # aiohttp needs list values expanded into repeated keys
+        query = [(k, str(item)) for k, v in params.items() for item in (v if isinstance(v, list) else [v])]
+        return await self._make_request(endpoint, params=query)
+
+    async def _make_request_with_pagination(self, endpoint: str, params: Optional[dict] = None) -> List[Dict]:
+        """
+        Make paginated API requests and return all items
+
+        Inside get_configuration() each collection is downloaded once and
+        shared between the methods that need it. A collection cut short by a
+        failed page is added to incomplete_collections.
+        """
+        if self._collection_tasks is None:
+            items = await self._fetch_all_pages(endpoint, params)
+        else:
+            key = XIQAPIClient._cache_key('collection', endpoint, params)
+            task = self._collection_tasks.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch_all_pages(endpoint, params))
+                self._collection_tasks[key] = task
+            items = await asyncio.shield(task)
+        return self._collection_items(endpoint, items)
+
+    def _collection_items(self, endpoint: str, items: Optional[List[Dict]]) -> List[Dict]:
+        """Record an incomplete collection and return its items as a plain list"""
+        if isinstance(items, IncompleteCollection):
+            self.incomplete_collections.add(endpoint)
+        return list(items or [])
+
+    async def _fetch_all_pages(self, endpoint: str, params: Optional[dict] = None) -> Optional[List[Dict]]:
+        """
+        Download every page of a collection, pages 2..N concurrently
+
+        Returns:
+            All items; an IncompleteCollection if a later page failed; None if the
+            first page failed (the endpoint gave no usable answer)
+        """
+        first_page = await self._fetch_page(endpoint, 1, params)
+        if first_page is None:
+            return None
+        if not first_page:
+            return []
+
+        all_items = list(XIQAPIClient._extract_items(first_page))
+        if not all_items:
+            return []
+
+        total_pages = 1
+        if isinstance(first_page, dict):
+            total_pages = first_page.get('total_pages', first_page.get('totalPages', 1)) or 1
+
+        last_page = min(total_pages, MAX_PAGINATION_PAGES)
+        if last_page > 1:
+            semaphore = asyncio.Semaphore(self.page_concurrency)
+
+            async def fetch(page: int):
+                async with semaphore:
+                    return await self._fetch_page(endpoint, page, params)
+
+            # gather() keeps submission order, so items stay in page order
+            results = await asyncio.gather(*(fetch(page) for page in range(2, last_page + 1)))
+            for page, result in enumerate(results, start=2):
+                if result is None:
+                    # Always shown - continuing silently would migrate a partial collection
+                    print(f"    WARNING: Page {page} of {endpoint} failed after all retries - collection is incomplete")
+                    return IncompleteCollection(all_items)
+                items = XIQAPIClient._extract_items(result)
+                if not items:
+                    break
+                all_items.extend(items)
+
+        if total_pages > MAX_PAGINATION_PAGES and self.verbose:
+            print(f"    WARNING: Reached maximum page limit ({MAX_PAGINATION_PAGES}), may not have retrieved all items")
+
+        return all_items
+
+    async def get_configuration(self, network_policy_id: Optional[int] = None, include_devices: bool = False) -> Dict[str, Any]:
+        """
+        Get wireless configuration from XIQ, fetching all collections concurrently
+
+        Args:
+            network_policy_id: Only fetch the SSIDs, user profiles and RADIUS servers this
+                               network policy uses (following references transitively)
+            include_devices: Also fetch devices (APs) and return them under 'devices'
+
+        Returns:
+            Dictionary containing extracted configuration
+
+        Raises:
+            IncompleteExtractionError: If pages of a collection failed after all retries
+        """
+        if self.verbose:
+            print("Retrieving configuration from Extreme Cloud IQ...")
+
+        self._collection_tasks = {}
+        self.incomplete_collections = set()
+        try:
+            if network_policy_id is not None:
+                config = await self._get_policy_configuration(network_policy_id, include_devices)
+                self._raise_if_incomplete()
+                return config
+
+            fetchers: Dict[str, Awaitable] = {
+                'network_policies': self.get_network_policies(),
+                'user_profiles': self.get_user_profiles(),
+                'vlans': self.get_vlans(),
+                'ssids': self.get_ssids(),
+                'radio_profiles': self.get_radio_profiles(),
+                'authentication': self.get_radius_servers()
+            }
+            if include_devices:
+                fetchers['devices'] = self.get_devices()
+
+            results = await asyncio.gather(*fetchers.values())
+        finally:
+            self._collection_tasks = None
+        self._raise_if_incomplete()
+
+        config = XIQAPIClient._assemble_configuration(dict(zip(fetchers.keys(), results)))
+
+        if self.verbose:
+            XIQAPIClient._print_configuration_summary(config)
+
+        return config
+
+    def _raise_if_incomplete(self):
+        """Raise IncompleteExtractionError if a collection of this extraction was cut short"""
+        if self.incomplete_collections:
+            raise IncompleteExtractionError(sorted(self.incomplete_collections))
+
+    async def _get_policy_configuration(self, network_policy_id: int, include_devices: bool) -> Dict[str, Any]:
+        """Fetch only the objects one network policy uses (see XIQAPIClient._get_policy_configuration)"""
+        policy = await self._make_request(f"/network-policies/{network_policy_id}")
+        if not policy:
+            raise Exception(f"Network policy {network_policy_id} not found in XIQ")
+
+        fetchers: Dict[str, Awaitable] = {
+            'policy_objects': self._get_policy_objects(network_policy_id),
+            'radio_profiles': self.get_radio_profiles()
+        }
+        if include_devices:
+            fetchers['devices'] = self.get_devices(network_policy_id=network_policy_id)
+
+        collections = dict(zip(fetchers.keys(), await asyncio.gather(*fetchers.values())))
+        collections.update(collections.pop('policy_objects'))
+        collections['network_policies'] = [policy]
+
+        config = XIQAPIClient._assemble_configuration(collections)
+
+        if self.verbose:
+            print(f"\n  Scoped to network policy {policy.get('name', network_policy_id)} ({network_policy_id})")
+            XIQAPIClient._print_configuration_summary(config)
+
+        return config
+
+    async def _get_policy_objects(self, network_policy_id: int) -> Dict[str, List[Any]]:
+        """Fetch a policy's SSIDs and follow their references to user profiles and RADIUS servers"""
+        raw_ssids = await self._make_request_with_pagination(f"/network-policies/{network_policy_id}/ssids")
+
+        user_profiles = await self._fetch_objects("/user-profiles",
+                                                  XIQAPIClient._referenced_ids(raw_ssids, USER_PROFILE_REFERENCE_KEYS))
+        radius_clients = await self._fetch_objects("/radius-client-objects",
+                                                   XIQAPIClient._referenced_ids(raw_ssids + user_profiles, RADIUS_CLIENT_REFERENCE_KEYS))
+        raw_servers = await self._fetch_objects("/radius-servers/external",
+                                                XIQAPIClient._referenced_ids(radius_clients, RADIUS_SERVER_REFERENCE_KEYS))
+
+        ssids = [XIQAPIClient._normalize_ssid(ssid) for ssid in raw_ssids]
+        if raw_servers:
+            servers = [XIQAPIClient._normalize_radius_server(server) for server in raw_servers]
+        elif any(ssid['security']['type'] == 'dot1x' for ssid in ssids):
+            # 802.1X SSIDs whose RADIUS references could not be resolved - fall back to the full list
+            servers = await self.get_radius_servers()
+        else:
+            servers = []
+
+        return {
+            'ssids': ssids,
+            'user_profiles': user_profiles,
+            'vlans': XIQAPIClient._extract_vlans(user_profiles),
+            'authentication': servers
+        }
+
+    async def _fetch_objects(self, endpoint: str, object_ids: List[Any]) -> List[Dict[str, Any]]:
+        """Fetch objects by id (GET <endpoint>/<id>) concurrently, skipping ones that fail"""
+        semaphore = asyncio.Semaphore(self.page_concurrency)
+
+        async def fetch(object_id):
+            async with semaphore:
+                return await self._make_request(f"{endpoint}/{object_id}")
+
+        results = await asyncio.gather(*(fetch(object_id) for object_id in object_ids))
+        return [result for result in results if isinstance(result, dict)]
+
+    async def get_network_policies(self) -> List[Dict[str, Any]]:
+        """Get network policies from XIQ"""
+        return await self._make_request_with_pagination("/network-policies")
+
+    async def get_ssids(self) -> List[Dict[str, Any]]:
+        """Get all SSIDs from XIQ"""
+        ssids = await self._make_request_with_pagination("/ssids")
+        return [XIQAPIClient._normalize_ssid(ssid) for ssid in ssids]
+
+    async def get_vlans(self) -> List[Dict[str, Any]]:
+        """Get all VLANs from XIQ (embedded in user profiles under vlan_profile)"""
+        user_profiles = await self._make_request_with_pagination("/user-profiles")
+        return XIQAPIClient._extract_vlans(user_profiles)
+
+    async def get_radio_profiles(self) -> List[Dict[str, Any]]:
+        """Get radio profiles from XIQ"""
+        profiles = await self._make_request_with_pagination("/radio-profiles")
+        return [XIQAPIClient._normalize_radio_profile(profile) for profile in profiles]
+
+    async def get_radius_servers(self) -> List[Dict[str, Any]]:
+        """Get RADIUS server configurations from XIQ (remembered endpoint first, then a concurrent probe)"""
+        servers = []
+        remembered = self.endpoint_cache.get(self.tenant, 'radius_servers') if self.endpoint_cache else None
+        if remembered:
+            servers = await self._make_request_with_pagination(remembered)
+
+        if not servers:
+            # Not shared through _collection_tasks, so cancelling a losing probe stops its page walk
+            tasks = [(endpoint, asyncio.ensure_future(self._fetch_all_pages(endpoint)))
+                     for endpoint in XIQ_RADIUS_ENDPOINTS]
+            try:
+                for endpoint, task in tasks:
+                    servers = self._collection_items(endpoint, await task)
+                    if servers:
+                        if self.endpoint_cache:
+                            self.endpoint_cache.set(self.tenant, 'radius_servers', endpoint)
+                        break
+            finally:
+                for _, task in tasks:
+                    task.cancel()
+
+        return [XIQAPIClient._normalize_radius_server(server) for server in servers]
+
+    async def get_devices(self, server_filter: bool = True, network_policy_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get all devices (APs) from XIQ, filtered server-side where supported (optionally to one network policy)"""
+        devices = []
+        if server_filter and XIQ_DEVICE_QUERY:
+            devices = await self._make_request_with_pagination("/devices", params=XIQ_DEVICE_QUERY)
+        if not devices:
+            devices = await self._make_request_with_pagination("/devices")
+        aps = [device for device in devices if XIQAPIClient._is_access_point(device)]
+        if network_policy_id is not None:
+            aps = XIQAPIClient._filter_policy_devices(aps, network_policy_id)
+        return [XIQAPIClient._normalize_device(device) for device in aps]
+
+    async def get_user_profiles(self) -> List[Dict[str, Any]]:
+        """Get user profiles from XIQ"""
+        return await self._make_request_with_pagination("/user-profiles")
+
+    async def test_connection(self) -> bool:
+        """
+        Test connection to XIQ API
+
+        Returns:
+            True if connection is successful, False otherwise
+        """
+        try:
+            async with self._get_session().get(
+                f'{self.base_url}/network-policies',
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                return response.status in [200, 401]  # 401 means connected but auth issue
+        except Exception:
+            return False
+
+
+def run_sync(coro: Awaitable) -> Any:
+    """Run a coroutine to completion from synchronous code (CLI, Flask request threads)"""
+    return asyncio.run(coro)
+
+
+def extract_configuration(api_token: str, base_url: str = "https://api.extremecloudiq.com", include_devices: bool = True, **client_kwargs) -> Dict[str, Any]:
+    """
+    Synchronous wrapper: extract a full configuration with AsyncXIQAPIClient
+
+    Args:
+        api_token: XIQ API token
+        base_url: API base URL
+        include_devices: Also fetch devices (APs)
+        **client_kwargs: Extra AsyncXIQAPIClient arguments (verify_ssl, verbose, ...)
+
+    Returns:
+        Configuration dictionary in the same format as XIQAPIClient.get_configuration()
+    """
+    async def _extract():
+        async with AsyncXIQAPIClient(api_token, base_url, **client_kwargs) as client:
+            return await client.get_configuration(include_devices=include_devices)
+
+    return run_sync(_extract())
@@ -0,0 +1,256 @@
+"""
+Bulk XIQ Extractor
+Extracts configuration and devices from many XIQ tenants in one run, under a
+global and a per-region concurrency cap, writing one snapshot per tenant plus
+a summary of timings
+"""
+
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
+
+try:
+    from .xiq_api_client import XIQAPIClient
+    from .export_utils import export_to_json
+    from .json_codec import load_file, dump_file
+except ImportError:
+    from xiq_api_client import XIQAPIClient
+    from export_utils import export_to_json
+    from json_codec import load_file, dump_file
+
+# Import configuration constants
+try:
+    from .config import XIQ_REGION_URLS, XIQ_BULK_MAX_TENANTS, XIQ_BULK_PER_REGION
+except ImportError:
+    # Fallback if config.py doesn't exist
+    XIQ_REGION_URLS = {
+        'Global': 'https://api.extremecloudiq.com',
+        'EU': 'https://api-eu.extremecloudiq.com',
+        'APAC': 'https://api-apac.extremecloudiq.com',
+        'California': 'https://api-ca.extremecloudiq.com'
+    }
+    XIQ_BULK_MAX_TENANTS = 8
+    XIQ_BULK_PER_REGION = 4
+
+# Short region names accepted in manifests (as used by --xiq-region)
+REGION_ALIASES = {'cal': 'California'}
+
+
+def resolve_region_url(region: Optional[str]) -> str:
+    """
+    Resolve a manifest region to an API base URL
+
+    Args:
+        region: Region name from XIQ_REGION_URLS (case-insensitive), a short
+                alias such as 'cal', or a full https:// URL
+
+    Returns:
+        API base URL
+    """
+    if not region:
+        return XIQ_REGION_URLS['Global']
+    if region.startswith('http://') or region.startswith('https://'):
+        return region.rstrip('/')
+
+    name = REGION_ALIASES.get(region.lower(), region)
+    for key, url in XIQ_REGION_URLS.items():
+        if key.lower() == name.lower():
+            return url
+    raise ValueError(f"Unknown XIQ region '{region}' (expected one of: {', '.join(XIQ_REGION_URLS)})")
+
+
+def load_manifest(path: str) -> List[Dict[str, Any]]:
+    """
+    Load a bulk extraction manifest
+
+    The manifest is a JSON list of tenants (or {"tenants": [...]}), e.g.:
+
+        [
+          {"name": "acme", "region": "EU", "token_env": "ACME_XIQ_TOKEN"},
+          {"name": "globex", "region": "Global", "username": "ops@globex.com", "password": "..."}
+        ]
+
+    Each tenant needs a name and one of token, token_env (environment variable
+    holding the token) or username/password.
+
+    Returns:
+        List of tenant dictionaries
+    """
+    manifest = load_file(path)
+
+    tenants = manifest.get('tenants', []) if isinstance(manifest, dict) else manifest
+    if not isinstance(tenants, list):
+        raise ValueError(f"{path}: manifest must be a list of tenants")
+
+    seen = set()
+    for index, tenant in enumerate(tenants):
+        name = tenant.get('name')
+        if not name:
+            raise ValueError(f"{path}: tenant #{index + 1} has no name")
+        if name in seen:
+            raise ValueError(f"{path}: duplicate tenant name '{name}'")
+        seen.add(name)
+        if not (tenant.get('token') or tenant.get('token_env') or (tenant.get('username') and tenant.get('password'))):
+            raise ValueError(f"{path}: tenant '{name}' needs token, token_env or username/password")
+    return tenants
+
+
+class BulkExtractor:
+    """
+    Runs XIQ extractions for many tenants concurrently
+
+    Tenants wait in one queue per region and are only handed to the global
+    worker pool while their region has a free slot, so a busy region never
+    holds global workers that tenants of other regions could use.
+    """
+
+    def __init__(self, max_tenants: int = XIQ_BULK_MAX_TENANTS, per_region: int = XIQ_BULK_PER_REGION,
+                 verbose: bool = False, **client_options):
+        """
+        Initialize bulk extractor
+
+        Args:
+            max_tenants: Maximum number of tenants extracted at the same time
+            per_region: Maximum number of tenants extracted at the same time per region
+            verbose: Enable verbose logging (per-tenant clients stay quiet)
+            **client_options: Extra XIQAPIClient arguments (page_concurrency, compact, stats, ...)
+        """
+        self.max_tenants = max(1, max_tenants)
+        self.per_region = max(1, per_region)
+        self.verbose = verbose
+        self.client_options = client_options
+
+    @staticmethod
+    def _snapshot_filename(name: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]+', '_', name) + '.json'
+
+    def _connect(self, tenant: Dict[str, Any], base_url: str) -> XIQAPIClient:
+        """Create a client from the tenant's token or credentials"""
+        token = tenant.get('token')
+        if not token and tenant.get('token_env'):
+            token = os.environ.get(tenant['token_env'])
+            if not token:
+                raise Exception(f"Environment variable {tenant['token_env']} is not set")
+        if token:
+            return XIQAPIClient(token, base_url, **self.client_options)
+        return XIQAPIClient.login(tenant['username'], tenant['password'], base_url, **self.client_options)
+
+    def extract_tenant(self, tenant: Dict[str, Any], output_dir: str, queued_seconds: float = 0.0) -> Dict[str, Any]:
+        """
+        Extract one tenant and write its snapshot
+
+        Args:
+            tenant: Tenant dictionary (see load_manifest)
+            output_dir: Directory for the snapshot
+            queued_seconds: Time the tenant waited for a free slot (reported in the summary)
+
+        Returns:
+            Summary entry with status, timings and object counts
+        """
+        name = tenant['name']
+        result = {'name': name, 'region': tenant.get('region', 'Global'), 'status': 'failed',
+                  'queued_seconds': round(queued_seconds, 3)}
+        started = time.monotonic()
+        client = None
+        try:
+            base_url = resolve_region_url(tenant.get('region'))
+            result['base_url'] = base_url
+
+            step = time.monotonic()
+            client = self._connect(tenant, base_url)
+            result['connect_seconds'] = round(time.monotonic() - step, 3)
+
+            step = time.monotonic()
+            config = client.get_configuration(include_devices=tenant.get('include_devices', True))
+            result['extract_seconds'] = round(time.monotonic() - step, 3)
+
+            snapshot_file = os.path.join(output_dir, self._snapshot_filename(name))
+            export_to_json(config, snapshot_file)
+
+            result['snapshot'] = snapshot_file
+            result['counts'] = {key: len(value) for key, value in config.items() if isinstance(value, list)}
+            result['status'] = 'ok'
+        except Exception as e:
+            result['error'] = str(e)
+        finally:
+            # Release the tenant's connection pool before the next tenant takes the slot
+            if client is not None:
+                client.close()
+
+        result['total_seconds'] = round(time.monotonic() - started + queued_seconds, 3)
+        if self.verbose or result['status'] != 'ok':
+            status = '✓' if result['status'] == 'ok' else '✗'
+            detail = f"{result['total_seconds']}s" if result['status'] == 'ok' else result.get('error')
+            print(f"  {status} {name}: {detail}")
+        return result
+
+    @staticmethod
+    def _region_key(tenant: Dict[str, Any]) -> str:
+        """Queue key for a tenant - its base URL, or the raw region if it doesn't resolve"""
+        try:
+            return resolve_region_url(tenant.get('region'))
+        except ValueError:
+            # Fails fast in extract_tenant; it just needs a queue
+            return str(tenant.get('region'))
+
+    def run(self, tenants: List[Dict[str, Any]], output_dir: str) -> Dict[str, Any]:
+        """
+        Extract all tenants and write summary.json next to the snapshots
+
+        Args:
+            tenants: Tenant dictionaries (see load_manifest)
+            output_dir: Directory for <tenant>.json snapshots and summary.json
+
+        Returns:
+            Summary dictionary
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        started_at = datetime.now(timezone.utc).isoformat()
+        started = time.monotonic()
+
+        # One FIFO queue per region, in manifest order
+        queues: Dict[str, deque] = {}
+        for index, tenant in enumerate(tenants):
+            queues.setdefault(self._region_key(tenant), deque()).append((index, tenant))
+        active = {region: 0 for region in queues}
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tenants)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_tenants, max(1, len(tenants)))) as executor:
+            running = {}
+
+            def dispatch():
+                # Start the earliest-listed tenants whose region has a free slot
+                while len(running) < self.max_tenants:
+                    ready = [region for region, queue in queues.items() if queue and active[region] < self.per_region]
+                    if not ready:
+                        return
+                    region = min(ready, key=lambda r: queues[r][0][0])
+                    index, tenant = queues[region].popleft()
+                    active[region] += 1
+                    future = executor.submit(self.extract_tenant, tenant, output_dir, time.monotonic() - started)
+                    running[future] = (index, region)
+
+            dispatch()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, region = running.pop(future)
+                    active[region] -= 1
+                    results[index] = future.result()
+                dispatch()
+
+        summary = {
+            'started_at': started_at,
+            'total_seconds': round(time.monotonic() - started, 3),
+            'max_tenants': self.max_tenants,
+            'per_region': self.per_region,
+            'succeeded': sum(1 for r in results if r['status'] == 'ok'),
+            'failed': sum(1 for r in results if r['status'] != 'ok'),
+            'tenants': results
+        }
+        dump_file(summary, os.path.join(output_dir, 'summary.json'))
+        return summary
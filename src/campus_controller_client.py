@@ -5,30 +5,63 @@ Based on Edge Services v5.26 REST API Gateway
 """
 
 import requests
-import json
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, Iterable, List, Optional
 from urllib.parse import urljoin
 import warnings
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # Import configuration constants
 try:
-    from .config import EDGE_SERVICES_DEFAULT_PORT, EDGE_SERVICES_BASE_PATH, DEFAULT_API_TIMEOUT
+    from .config import EDGE_SERVICES_DEFAULT_PORT, EDGE_SERVICES_BASE_PATH, DEFAULT_API_TIMEOUT, EDGE_POST_CONCURRENCY
 except ImportError:
     # Fallback if config.py doesn't exist
     EDGE_SERVICES_DEFAULT_PORT = 5825
     EDGE_SERVICES_BASE_PATH = '/management'
     DEFAULT_API_TIMEOUT = 30
+    EDGE_POST_CONCURRENCY = 8
+
+try:
+    from .api_stats import APIStats
+except ImportError:
+    from api_stats import APIStats
+
+try:
+    from .http_session import build_session
+except ImportError:
+    from http_session import build_session
+
+try:
+    from .json_codec import loads, dumps_bytes
+except ImportError:
+    from json_codec import loads, dumps_bytes
+
+try:
+    from .dependency_graph import DependencyGraph
+except ImportError:
+    from dependency_graph import DependencyGraph
+
+try:
+    from .migration_journal import MigrationJournal, DONE_STATUSES
+except ImportError:
+    from migration_journal import MigrationJournal, DONE_STATUSES
 
 # Suppress SSL warnings for self-signed certificates (common in enterprise environments)
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 
 
 class CampusControllerClient:
-    """Client for interacting with Extreme Edge Services API"""
+    """
+    Client for interacting with Extreme Edge Services API
+
+    Use it as a context manager (or call close()) so the background token
+    refresh and the connection pool are released.
+    """
 
-    def __init__(self, base_url: str, username: str, password: str, verify_ssl: bool = False, verbose: bool = False):
+    def __init__(self, base_url: str, username: str, password: str, verify_ssl: bool = False, verbose: bool = False,
+                 stats: Optional[APIStats] = None):
         """
         Initialize Edge Services API client
 
@@ -38,6 +71,8 @@ class CampusControllerClient:
             password: Password for authentication
             verify_ssl: Whether to verify SSL certificates (default: False for self-signed certs)
             verbose: Enable verbose logging
+            stats: APIStats to record requests in (share one across clients for a
+                   single report); a new one is created otherwise
         """
         # Ensure port is included
         port_str = f':{EDGE_SERVICES_DEFAULT_PORT}'
@@ -51,12 +86,25 @@ class CampusControllerClient:
         self.password = password
         self.verify_ssl = verify_ssl
         self.verbose = verbose
-        self.session = requests.Session()
-        self.session.verify = verify_ssl
+        self.session = build_session(verify_ssl, verbose=verbose)
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        })
+        self.stats = stats if stats is not None else APIStats()
         self.access_token = None
+        self.token_type = 'Bearer'
         self.token_expiry = None
         self.token_expires_in = None
 
+        # Token refresh is single-flight: one thread re-authenticates, the others wait for it
+        self._auth_lock = threading.Lock()
+        self._refresh_timer = None
+        self._closed = False
+        # Background refreshes only continue while the client is being used
+        self._authenticated_at = 0.0
+        self._last_request = 0.0
+
         # Authenticate on initialization
         self._authenticate()
 
@@ -68,7 +116,8 @@ class CampusControllerClient:
             if self.verbose:
                 print(f"  Authenticating to {auth_url}...")
 
-            response = self.session.post(
+            response = self._timed_request(
+                'POST',
                 auth_url,
                 json={
                     'grantType': 'password',
@@ -79,19 +128,19 @@ class CampusControllerClient:
             )
 
             if response.status_code == 200:
-                data = response.json()
-                self.access_token = data.get('access_token')
-                token_type = data.get('token_type', 'Bearer')
+                data = loads(response.content)
+                self.token_type = data.get('token_type', 'Bearer')
                 self.token_expires_in = data.get('expires_in', 7200)  # Default 2 hours
 
                 # Calculate token expiry time (with 5 minute buffer for safety)
                 self.token_expiry = datetime.now() + timedelta(seconds=self.token_expires_in - 300)
+                # Publish the token last - requests read it without the lock
+                self.access_token = data.get('access_token')
+                self._authenticated_at = time.monotonic()
 
-                self.session.headers.update({
-                    'Authorization': f'{token_type} {self.access_token}',
-                    'Content-Type': 'application/json',
-                    'Accept': 'application/json'
-                })
+                # The token goes into each request's headers (see _auth_headers) rather than
+                # the shared session headers, so concurrent requests never see a half-updated session
+                self._schedule_refresh()
 
                 if self.verbose:
                     print("  Authentication successful")
@@ -103,12 +152,89 @@ class CampusControllerClient:
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to connect to Edge Services: {str(e)}")
 
+    def _auth_headers(self) -> Dict[str, str]:
+        """Authorization header for the current token"""
+        return {'Authorization': f'{self.token_type} {self.access_token}'}
+
+    def _refresh_token(self, stale_token: Optional[str] = None):
+        """
+        Re-authenticate unless another thread already has
+
+        Only one refresh runs at a time; threads arriving meanwhile wait for it
+        and then find the token fresh, so they don't log in again.
+
+        Args:
+            stale_token: Token that was rejected (401). If the current token
+                         differs, it was already refreshed. Without it, the
+                         token is refreshed only if it is expired.
+        """
+        with self._auth_lock:
+            if stale_token is not None:
+                if self.access_token != stale_token:
+                    return
+            elif self.token_expiry and datetime.now() < self.token_expiry:
+                return
+            self._authenticate()
+
+    def _schedule_refresh(self):
+        """Refresh the token in the background shortly before it expires"""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        if self._closed or not self.token_expiry:
+            return
+
+        delay = max((self.token_expiry - datetime.now()).total_seconds(), 0)
+        self._refresh_timer = threading.Timer(delay, self._background_refresh, args=(self.access_token,))
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _background_refresh(self, token: str):
+        """Timer callback: proactive refresh (failures fall back to refresh on demand)"""
+        if self._last_request < self._authenticated_at:
+            # Idle since the last login - let the token lapse; the next request refreshes it on demand
+            if self.verbose:
+                print("  Token about to expire, client idle - not refreshing in the background")
+            return
+        try:
+            if self.verbose:
+                print("  Token about to expire, refreshing in the background...")
+            self._refresh_token(stale_token=token)
+        except Exception as e:
+            if self.verbose:
+                print(f"  Warning: Background token refresh failed: {e}")
+
     def _check_token_expiry(self):
         """Check if token is expired or about to expire, re-authenticate if needed"""
         if self.token_expiry and datetime.now() >= self.token_expiry:
             if self.verbose:
                 print("  Token expired, re-authenticating...")
-            self._authenticate()
+            self._refresh_token()
+
+    def close(self):
+        """Stop the background token refresh and close the HTTP session"""
+        self._closed = True
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _timed_request(self, method: str, url: str, retry: bool = False, **kwargs) -> requests.Response:
+        """Send one request and record it in self.stats"""
+        body = kwargs.get('data')
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.stats.record(method, url, None, time.perf_counter() - started, retry=retry)
+            raise
+        self.stats.record(method, url, response.status_code, time.perf_counter() - started,
+                          bytes_received=len(response.content), bytes_sent=len(body) if body else 0, retry=retry)
+        return response
 
     def _make_request_with_retry(self, method: str, url: str, max_retries: int = 3, **kwargs) -> requests.Response:
         """
@@ -126,6 +252,8 @@ class CampusControllerClient:
         Raises:
             Exception: If all retries fail
         """
+        self._last_request = time.monotonic()
+
         # Check token expiry before making request
         self._check_token_expiry()
 
@@ -133,19 +261,28 @@ class CampusControllerClient:
         if 'timeout' not in kwargs:
             kwargs['timeout'] = DEFAULT_API_TIMEOUT
 
+        # Encode JSON bodies once with the fast codec (session sends Content-Type: application/json)
+        if 'json' in kwargs:
+            kwargs['data'] = dumps_bytes(kwargs.pop('json'))
+
         last_exception = None
 
+        extra_headers = kwargs.pop('headers', None) or {}
+
         for attempt in range(max_retries):
             try:
-                response = self.session.request(method, url, **kwargs)
+                token = self.access_token
+                response = self._timed_request(method, url, retry=attempt > 0,
+                                               headers={**extra_headers, **self._auth_headers()}, **kwargs)
 
                 # Handle 401 Unauthorized - token expired
                 if response.status_code == 401:
                     if self.verbose:
                         print(f"  Received 401 Unauthorized, re-authenticating... (attempt {attempt + 1}/{max_retries})")
-                    self._authenticate()
+                    self._refresh_token(stale_token=token)
                     # Retry with new token
-                    response = self.session.request(method, url, **kwargs)
+                    response = self._timed_request(method, url, retry=True,
+                                                   headers={**extra_headers, **self._auth_headers()}, **kwargs)
 
                 return response
 
@@ -172,53 +309,137 @@ class CampusControllerClient:
 
         raise Exception(f"Request failed after {max_retries} attempts: {str(last_exception)}")
 
-    def post_configuration(self, config: Dict[str, Any]) -> Dict[str, Any]:
+    # Object types posted by post_configuration: config key -> (endpoint, name field, summary noun)
+    POST_TYPES = {
+        'rate_limiters': ('ratelimiters', 'name', 'rate limiters'),
+        'cos_policies': ('cos', 'name', 'CoS policies'),
+        'topologies': ('topologies', 'name', 'topologies'),
+        'aaa_policies': ('aaapolicy', 'policyName', 'AAA policies'),
+        'services': ('services', 'serviceName', 'services'),
+        'ap_configs': (None, 'serial', 'AP configurations')
+    }
+
+    def post_configuration(self, config: Dict[str, Any], max_workers: int = EDGE_POST_CONCURRENCY,
+                           update_existing: bool = False, journal: Optional[MigrationJournal] = None) -> Dict[str, Any]:
         """
         Post configuration to Edge Services
 
+        Objects are posted as a dependency graph rather than in type-by-type
+        phases: a CoS policy waits only for its own rate limiters, a service
+        only for its default topology, AAA policy and CoS. Independent
+        requests run concurrently, up to max_workers at a time. An object whose
+        dependency failed to post is not sent. AP radio settings shared by
+        several APs are applied with one /v1/aps/multiconfig request per group.
+
+        Before posting, the existing objects of each type are looked up once
+        (the nametoidmap endpoints, in parallel) so a re-run only sends the
+        requests that are needed: new objects are created, existing ones
+        (same name, or for topologies the same VLAN) are skipped or updated.
+        Existing objects keep their controller ids - the 'id' of each such
+        object in config, and every reference to it, is rewritten to the
+        existing id so later steps (profile assignments) address it.
+
+        With a journal, every finished operation is appended to it as it
+        completes; operations a resumed journal records as done (with an
+        unchanged payload) are not sent again.
+
         Args:
             config: Converted configuration dictionary
+            max_workers: Maximum number of requests in flight
+            update_existing: PUT objects that already exist instead of skipping them
+            journal: MigrationJournal to record operations in and resume from
 
         Returns:
-            Dictionary with success status and details
+            Dictionary with success status, per-type summaries under 'details',
+            the controller ids of the objects created under 'created' (type -> ids)
+            and converted id -> controller id for adopted objects (and created
+            objects the controller gave a different id) under 'id_map'
         """
         results = {
             'success': True,
             'details': {},
+            'created': {},
+            'id_map': {},
             'errors': []
         }
 
-        # Post different configuration components in dependency order
         try:
-            # 1. Post Rate Limiters first - dependency for CoS and Services
-            if config.get('rate_limiters'):
-                rate_limiter_result = self._post_rate_limiters(config['rate_limiters'])
-                results['details']['rate_limiters'] = rate_limiter_result
-
-            # 2. Post Class of Service policies - depends on rate limiters
-            if config.get('cos_policies'):
-                cos_result = self._post_cos_policies(config['cos_policies'])
-                results['details']['cos_policies'] = cos_result
-
-            # 3. Post Topologies (VLANs) - dependencies for services
-            if config.get('topologies'):
-                topology_result = self._post_topologies(config['topologies'])
-                results['details']['topologies'] = topology_result
-
-            # 4. Post AAA Policies (RADIUS servers)
-            if config.get('aaa_policies'):
-                aaa_result = self._post_aaa_policies(config['aaa_policies'])
-                results['details']['aaa_policies'] = aaa_result
-
-            # 5. Post Services (SSIDs) - depend on topologies and AAA policies
-            if config.get('services'):
-                service_result = self._post_services(config['services'])
-                results['details']['services'] = service_result
-
-            # 6. Update AP configurations (names and locations)
-            if config.get('ap_configs'):
-                ap_result = self._update_ap_configs(config['ap_configs'])
-                results['details']['ap_configs'] = ap_result
+            # Create, skip or update each object depending on what already exists
+            actions, results['id_map'] = self._plan_upserts(config, self._prefetch_existing(config), update_existing,
+                                                            journal)
+
+            # Radio settings shared by several APs go out in one multiconfig request per group;
+            # names and locations are per-AP and keep their individual PUTs
+            radio_groups, ap_configs = self._plan_ap_updates(config.get('ap_configs') or [])
+            objects = dict(config, ap_configs=ap_configs)
+
+            def run(kind, obj, action):
+                if action == 'resume':
+                    if self.verbose:
+                        print(f"  Skipped {kind} '{self._journal_key(kind, obj)}' (done in a previous run)")
+                    return 'resumed'
+                if kind == 'ap_radio_groups':
+                    status = self._put_ap_multiconfig(obj)
+                else:
+                    converted_id = obj.get('id')
+                    status = self._post_object(kind, obj, action)
+                    if converted_id and obj.get('id') != converted_id:
+                        # The controller assigned its own id - dependents (not started yet) must use it
+                        with id_lock:
+                            results['id_map'][converted_id] = obj['id']
+                            self._rewrite_references(config, {converted_id: obj['id']})
+                key = self._journal_key(kind, obj)
+                if journal is not None and key is not None:
+                    journal.record(kind, key, obj, status, obj.get('id', obj.get('serial')))
+                return status
+
+            def journaled(kind, obj):
+                key = self._journal_key(kind, obj)
+                return journal is not None and key is not None and journal.completed(kind, key, obj) is not None
+
+            id_lock = threading.Lock()
+            graph = DependencyGraph()
+            nodes = {}
+            for index, group in enumerate(radio_groups):
+                action = 'resume' if journaled('ap_radio_groups', group) else 'update'
+                graph.add(('ap_radio_groups', index), lambda group=group, action=action: run('ap_radio_groups', group, action))
+            for kind in self.POST_TYPES:
+                for index, obj in enumerate(objects.get(kind) or []):
+                    if kind == 'ap_configs':
+                        action = 'resume' if journaled(kind, obj) else 'create'
+                    else:
+                        action = actions.get((kind, index), 'create')
+                    # Objects matched to the same existing object share its id - keep their keys distinct
+                    key = (kind, obj.get('id', index))
+                    if key in graph:
+                        key = (kind, index)
+                    nodes[key] = obj
+                    graph.add(key, lambda kind=kind, obj=obj, action=action: run(kind, obj, action),
+                              self._post_dependencies(kind, obj))
+
+            def blocked(key, failed):
+                if self.verbose:
+                    print(f"  Skipping {key[0]} {key[1]}: depends on {', '.join(f'{k} {i}' for k, i in failed)} which failed")
+                return 'failed'
+
+            outcomes = graph.run(max_workers, succeeded=lambda status: status in DONE_STATUSES,
+                                 on_blocked=blocked)
+
+            for kind, (_, _, noun) in self.POST_TYPES.items():
+                statuses = [status for (key_kind, _), status in outcomes.items() if key_kind == kind]
+                if statuses:
+                    results['details'][kind] = self._post_summary(kind, noun, statuses)
+                    if kind != 'ap_configs':
+                        # The objects' ids, not the graph keys (list indexes for objects without an id)
+                        results['created'][kind] = [nodes[key]['id'] for key, status in outcomes.items()
+                                                    if key[0] == kind and status == 'posted' and nodes[key].get('id')]
+
+            if radio_groups:
+                updated = [group for index, group in enumerate(radio_groups)
+                           if outcomes[('ap_radio_groups', index)] in ('posted', 'resumed')]
+                results['details']['ap_radio_groups'] = (
+                    f"{len(updated)}/{len(radio_groups)} AP radio groups updated successfully "
+                    f"({sum(len(g['serialNumbers']) for g in updated)} APs)")
 
         except Exception as e:
             results['success'] = False
@@ -227,272 +448,291 @@ class CampusControllerClient:
 
         return results
 
-    def get_existing_topologies(self) -> List[Dict[str, Any]]:
-        """Get existing topologies from Edge Services to avoid conflicts"""
-        url = f'{self.base_url}/v1/topologies'
-        try:
-            response = self._make_request_with_retry('GET', url)
-            if response.status_code == 200:
-                topologies = response.json()
-                return topologies if isinstance(topologies, list) else []
-        except Exception as e:
-            if self.verbose:
-                print(f"  Warning: Could not fetch existing topologies: {e}")
-        return []
-
-    def _post_rate_limiters(self, rate_limiters: List[Dict[str, Any]]) -> str:
+    def _prefetch_existing(self, config: Dict[str, Any]) -> Dict[str, Dict[Any, str]]:
         """
-        Post Rate Limiters to Edge Services
-
-        Args:
-            rate_limiters: List of rate limiter configurations
+        Look up the objects that already exist on the controller, one request per type in parallel
 
         Returns:
-            Result summary string
+            Config key -> {name: id}; topologies also map VLAN ID -> id under 'topology_vlans'
         """
-        url = f'{self.base_url}/v1/ratelimiters'
-        success_count = 0
-
-        for limiter in rate_limiters:
+        def name_map(endpoint):
             try:
-                if self.verbose:
-                    print(f"  Posting Rate Limiter '{limiter.get('name')}' ({limiter.get('cirKbps')} Kbps)...")
-
-                response = self._make_request_with_retry('POST', url, json=limiter)
-
-                if response.status_code in [200, 201]:
-                    success_count += 1
-                    if self.verbose:
-                        print(f"    Success")
-                else:
-                    error_msg = response.text
-                    if self.verbose:
-                        print(f"    Warning: Failed ({response.status_code}): {error_msg}")
-
+                response = self._make_request_with_retry('GET', f'{self.base_url}/v1/{endpoint}/nametoidmap')
+                if response.status_code == 200:
+                    mapping = loads(response.content)
+                    return mapping if isinstance(mapping, dict) else {}
             except Exception as e:
                 if self.verbose:
-                    print(f"    Error: {str(e)}")
-
-        return f"{success_count}/{len(rate_limiters)} rate limiters posted successfully"
+                    print(f"  Warning: Could not fetch existing {endpoint}: {e}")
+            return {}
+
+        def topology_maps():
+            # The full list is needed anyway to match topologies by VLAN ID
+            topologies = self.get_existing_topologies()
+            return {
+                'topologies': {t.get('name'): t.get('id') for t in topologies if t.get('name')},
+                'topology_vlans': {t.get('vlanid'): t.get('id') for t in topologies if t.get('vlanid')}
+            }
+
+        kinds = [kind for kind in self.POST_TYPES if kind != 'ap_configs' and config.get(kind)]
+        if not kinds:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=len(kinds)) as executor:
+            futures = {kind: executor.submit(topology_maps if kind == 'topologies' else name_map,
+                                             *(() if kind == 'topologies' else (self.POST_TYPES[kind][0],)))
+                       for kind in kinds}
+            existing = {}
+            for kind, future in futures.items():
+                if kind == 'topologies':
+                    existing.update(future.result())
+                else:
+                    existing[kind] = future.result()
+            return existing
 
-    def _post_cos_policies(self, cos_policies: List[Dict[str, Any]]) -> str:
+    def _plan_upserts(self, config: Dict[str, Any], existing: Dict[str, Dict[Any, str]],
+                      update_existing: bool, journal: Optional[MigrationJournal] = None) -> tuple:
         """
-        Post Class of Service policies to Edge Services
+        Decide 'create', 'skip', 'update' or 'resume' per object and adopt the ids of existing objects
 
-        Args:
-            cos_policies: List of CoS policy configurations
+        Objects that already exist (or that the journal records as done) take
+        over the existing id (in place), and references to them from CoS
+        policies and services are rewritten.
 
         Returns:
-            Result summary string
+            ((config key, index) -> action, converted id -> existing id)
         """
-        url = f'{self.base_url}/v1/cos'
-        success_count = 0
-
-        for policy in cos_policies:
-            try:
-                if self.verbose:
-                    print(f"  Posting CoS Policy '{policy.get('name')}'...")
-
-                response = self._make_request_with_retry('POST', url, json=policy)
+        actions = {}
+        id_map = {}
+        for kind, (_, name_field, _) in self.POST_TYPES.items():
+            if kind == 'ap_configs':
+                continue
+            names = existing.get(kind, {})
+            for index, obj in enumerate(config.get(kind) or []):
+                key = self._journal_key(kind, obj)
+                done = journal.completed(kind, key, obj) if journal is not None and key is not None else None
+                if done and done.get('id'):
+                    actions[(kind, index)] = 'resume'
+                    if obj.get('id') and obj['id'] != done['id']:
+                        id_map[obj['id']] = done['id']
+                    obj['id'] = done['id']
+                    continue
 
-                if response.status_code in [200, 201]:
-                    success_count += 1
-                    if self.verbose:
-                        print(f"    Success")
-                else:
-                    error_msg = response.text
-                    if self.verbose:
-                        print(f"    Warning: Failed ({response.status_code}): {error_msg}")
+                existing_id = None
+                if kind == 'topologies':
+                    existing_id = existing.get('topology_vlans', {}).get(obj.get('vlanid'))
+                if existing_id is None:
+                    existing_id = names.get(obj.get(name_field))
 
-            except Exception as e:
-                if self.verbose:
-                    print(f"    Error: {str(e)}")
+                if existing_id is None:
+                    actions[(kind, index)] = 'create'
+                    continue
 
-        return f"{success_count}/{len(cos_policies)} CoS policies posted successfully"
+                actions[(kind, index)] = 'update' if update_existing else 'skip'
+                if obj.get('id') and obj['id'] != existing_id:
+                    id_map[obj['id']] = existing_id
+                obj['id'] = existing_id
+
+        if id_map:
+            self._rewrite_references(config, id_map)
+        return actions, id_map
+
+    @staticmethod
+    def _rewrite_references(config: Dict[str, Any], id_map: Dict[str, str]):
+        """Point references from CoS policies and services at the ids in id_map"""
+        reference_fields = {
+            'cos_policies': ('inboundRateLimiterId', 'outboundRateLimiterId'),
+            'services': ('defaultTopology', 'aaaPolicyId', 'defaultCoS')
+        }
+        for kind, fields in reference_fields.items():
+            for obj in config.get(kind) or []:
+                for field in fields:
+                    if obj.get(field) in id_map:
+                        obj[field] = id_map[obj[field]]
 
-    def _post_topologies(self, topologies: List[Dict[str, Any]]) -> str:
+    def _journal_key(self, kind: str, obj: Dict[str, Any]) -> Optional[str]:
         """
-        Post Topologies (VLANs) to Edge Services
-
-        Args:
-            topologies: List of topology configurations
+        Identify an operation across runs (object name, AP serial or radio group serials)
 
         Returns:
-            Result summary string
+            The key, or None for an object without a name or serial - such
+            operations are never journaled, so they cannot share one entry
         """
-        url = f'{self.base_url}/v1/topologies'
-        success_count = 0
-        skipped_count = 0
-
-        # Get existing topologies to avoid conflicts
-        existing_vlans = set()
-        try:
-            response = self._make_request_with_retry('GET', url)
-            if response.status_code == 200:
-                existing_topos = response.json()
-                if isinstance(existing_topos, list):
-                    existing_vlans = {t.get('vlanid') for t in existing_topos if t.get('vlanid')}
-        except:
-            pass
-
-        for topology in topologies:
-            try:
-                vlan_id = topology.get('vlanid')
-
-                if self.verbose:
-                    print(f"  Posting Topology (VLAN) {vlan_id} - {topology.get('name')}...")
-
-                # Check if VLAN already exists
-                if vlan_id in existing_vlans:
-                    if self.verbose:
-                        print(f"    Skipped (VLAN {vlan_id} already exists)")
-                    skipped_count += 1
-                    continue
-
-                response = self._make_request_with_retry('POST', url, json=topology)
-
-                if response.status_code in [200, 201]:
-                    success_count += 1
-                    if self.verbose:
-                        print(f"    Success")
-                else:
-                    error_msg = response.text
-                    if self.verbose:
-                        print(f"    Warning: Failed ({response.status_code}): {error_msg}")
-
-            except Exception as e:
-                if self.verbose:
-                    print(f"    Error: {str(e)}")
+        if kind == 'ap_radio_groups':
+            return ','.join(sorted(obj['serialNumbers']))
+        value = obj.get(self.POST_TYPES[kind][1])
+        return None if value is None or value == '' else str(value)
+
+    @staticmethod
+    def _post_dependencies(kind: str, obj: Dict[str, Any]) -> List[tuple]:
+        """Return the graph keys of the objects a converted object references"""
+        if kind == 'cos_policies':
+            return [('rate_limiters', obj.get('inboundRateLimiterId')),
+                    ('rate_limiters', obj.get('outboundRateLimiterId'))]
+        if kind == 'services':
+            return [('topologies', obj.get('defaultTopology')),
+                    ('aaa_policies', obj.get('aaaPolicyId')),
+                    ('cos_policies', obj.get('defaultCoS'))]
+        return []
 
-        result = f"{success_count}/{len(topologies)} topologies posted successfully"
-        if skipped_count > 0:
-            result += f" ({skipped_count} skipped - already exist)"
+    @staticmethod
+    def _post_summary(kind: str, noun: str, statuses: List[Any]) -> str:
+        """Build the per-type result summary string"""
+        posted = sum(1 for status in statuses if status == 'posted')
+        updated = sum(1 for status in statuses if status == 'updated')
+        skipped = sum(1 for status in statuses if status == 'skipped')
+        resumed = sum(1 for status in statuses if status == 'resumed')
+
+        if kind == 'ap_configs':
+            result = f"{posted}/{len(statuses)} {noun} updated successfully"
+            reason = 'no serial number'
+        else:
+            result = f"{posted}/{len(statuses)} {noun} posted successfully"
+            reason = 'already exist'
+        if updated > 0:
+            result += f" ({updated} updated - already exist)"
+        if skipped > 0:
+            result += f" ({skipped} skipped - {reason})"
+        if resumed > 0:
+            result += f" ({resumed} already done in a previous run)"
         return result
 
-    def _post_services(self, services: List[Dict[str, Any]]) -> str:
+    @staticmethod
+    def _plan_ap_updates(ap_configs: List[Dict[str, Any]]) -> tuple:
         """
-        Post Services (SSIDs) to Edge Services
+        Split AP configurations into multiconfig radio groups and per-AP updates
 
-        Args:
-            services: List of service configurations
+        PUT /v1/aps/multiconfig applies one radio configuration to a list of
+        serial numbers, so APs whose 'radios' are identical share one request.
+        The multiconfig element carries no name or location, so those stay
+        per-AP updates.
 
         Returns:
-            Result summary string
+            (radio groups as ApMultiConfigElement payloads, per-AP configs without 'radios')
         """
-        url = f'{self.base_url}/v1/services'
-        success_count = 0
-
-        for service in services:
-            try:
-                if self.verbose:
-                    print(f"  Posting Service (SSID) '{service.get('serviceName')}' (SSID: {service.get('ssid')}...)...")
-
-                response = self._make_request_with_retry('POST', url, json=service)
-
-                if response.status_code in [200, 201]:
-                    success_count += 1
-                    if self.verbose:
-                        print(f"    Success")
-                else:
-                    error_msg = response.text
-                    if self.verbose:
-                        print(f"    Warning: Failed ({response.status_code}): {error_msg}")
-
-            except Exception as e:
-                if self.verbose:
-                    print(f"    Error: {str(e)}")
-
-        return f"{success_count}/{len(services)} services posted successfully"
+        groups: Dict[bytes, Dict[str, Any]] = {}
+        individual = []
+        for ap_config in ap_configs:
+            serial = ap_config.get('serial')
+            radios = ap_config.get('radios')
+            if serial and radios:
+                key = dumps_bytes(sorted(radios, key=lambda radio: radio.get('radioIndex', 0)))
+                group = groups.setdefault(key, {'serialNumbers': [], 'radios': radios})
+                group['serialNumbers'].append(serial)
+                ap_config = {k: v for k, v in ap_config.items() if k != 'radios'}
+                if 'name' not in ap_config and 'location' not in ap_config:
+                    continue
+            individual.append(ap_config)
+        return list(groups.values()), individual
 
-    def _post_aaa_policies(self, policies: List[Dict[str, Any]]) -> str:
+    def _put_ap_multiconfig(self, group: Dict[str, Any]) -> str:
         """
-        Post AAA Policies (including RADIUS servers) to Edge Services
+        Apply one radio configuration to a group of APs
 
         Args:
-            policies: List of AAA policy configurations
+            group: ApMultiConfigElement payload ({'serialNumbers': [...], 'radios': [...]})
 
         Returns:
-            Result summary string
+            'posted' or 'failed'
         """
-        url = f'{self.base_url}/v1/aaapolicy'
-        success_count = 0
-
-        for policy in policies:
-            try:
-                if self.verbose:
-                    print(f"  Posting AAA Policy '{policy.get('policyName', 'Unknown')}'...")
-
-                response = self._make_request_with_retry('POST', url, json=policy)
-
-                if response.status_code in [200, 201]:
-                    success_count += 1
-                    if self.verbose:
-                        print(f"    Success")
-                else:
-                    error_msg = response.text
-                    if self.verbose:
-                        print(f"    Warning: Failed ({response.status_code}): {error_msg}")
-
-            except Exception as e:
+        label = f"radio configuration for {len(group['serialNumbers'])} APs"
+        try:
+            if self.verbose:
+                print(f"  Updating {label} via multiconfig...")
+            response = self._make_request_with_retry('PUT', f'{self.base_url}/v1/aps/multiconfig', json=group)
+            if response.status_code in [200, 204]:
                 if self.verbose:
-                    print(f"    Error: {str(e)}")
-
-        return f"{success_count}/{len(policies)} AAA policies posted successfully"
+                    print(f"    Success: {label}")
+                return 'posted'
+            if self.verbose:
+                print(f"    Warning: {label} failed ({response.status_code}): {response.text}")
+        except Exception as e:
+            if self.verbose:
+                print(f"    Error: {label}: {str(e)}")
+        return 'failed'
 
-    def _update_ap_configs(self, ap_configs: List[Dict[str, Any]]) -> str:
+    def _post_object(self, kind: str, obj: Dict[str, Any], action: str = 'create') -> str:
         """
-        Update AP configurations (names and locations) in Edge Services
+        Post (or, for AP configs, update) one configuration object
 
         Args:
-            ap_configs: List of AP configuration updates
+            kind: Configuration key (see POST_TYPES)
+            obj: Converted object
+            action: 'create' (POST), 'update' (PUT to the existing id) or 'skip'
 
         Returns:
-            Result summary string
+            'posted', 'updated', 'skipped' or 'failed'
         """
-        success_count = 0
-        skipped_count = 0
-
-        for ap_config in ap_configs:
-            try:
-                serial = ap_config.get('serial')
-                name = ap_config.get('name')
-                location = ap_config.get('location', '')
+        endpoint, name_field, _ = self.POST_TYPES[kind]
+        label = f"{kind} '{obj.get(name_field, 'Unknown')}'"
 
+        try:
+            if kind == 'ap_configs':
+                serial = obj.get('serial')
                 if not serial:
-                    skipped_count += 1
-                    continue
-
+                    return 'skipped'
                 if self.verbose:
-                    print(f"  Updating AP {serial} - Name: '{name}', Location: '{location}'...")
-
-                # Use PUT method to update AP configuration
-                url = f'{self.base_url}/v1/aps/{serial}'
-
-                # Build the update payload - only include name and location
-                update_payload = {
-                    'apName': name,
-                    'location': location
-                }
-
-                response = self._make_request_with_retry('PUT', url, json=update_payload)
-
-                if response.status_code in [200, 204]:
-                    success_count += 1
+                    print(f"  Updating AP {serial} - Name: '{obj.get('name')}', Location: '{obj.get('location', '')}'...")
+                # Only name and location are updated
+                response = self._make_request_with_retry('PUT', f'{self.base_url}/v1/aps/{serial}', json={
+                    'apName': obj.get('name'),
+                    'location': obj.get('location', '')
+                })
+                ok_statuses = (200, 204)
+            else:
+                if action == 'skip':
                     if self.verbose:
-                        print(f"    Success")
+                        print(f"  Skipped {label} (already exists)")
+                    return 'skipped'
+                if action == 'update':
+                    if self.verbose:
+                        print(f"  Updating existing {label}...")
+                    response = self._make_request_with_retry('PUT', f"{self.base_url}/v1/{endpoint}/{obj['id']}", json=obj)
+                    ok_statuses = (200, 204)
                 else:
-                    error_msg = response.text
                     if self.verbose:
-                        print(f"    Warning: Failed ({response.status_code}): {error_msg}")
+                        print(f"  Posting {label}...")
+                    response = self._make_request_with_retry('POST', f'{self.base_url}/v1/{endpoint}', json=obj)
+                    ok_statuses = (200, 201)
 
-            except Exception as e:
+            if response.status_code in ok_statuses:
+                if action == 'create' and kind != 'ap_configs':
+                    self._adopt_created_id(obj, response)
                 if self.verbose:
-                    print(f"    Error: {str(e)}")
+                    print(f"    Success: {label}")
+                return 'updated' if action == 'update' else 'posted'
 
-        result = f"{success_count}/{len(ap_configs)} AP configurations updated successfully"
-        if skipped_count > 0:
-            result += f" ({skipped_count} skipped - no serial number)"
-        return result
+            if self.verbose:
+                print(f"    Warning: {label} failed ({response.status_code}): {response.text}")
+            return 'failed'
+
+        except Exception as e:
+            if self.verbose:
+                print(f"    Error: {label}: {str(e)}")
+            return 'failed'
+
+    @staticmethod
+    def _adopt_created_id(obj: Dict[str, Any], response: requests.Response):
+        """Take over the id the controller returned for a created object, if any"""
+        try:
+            created = loads(response.content) if response.content else None
+        except ValueError:
+            return
+        if isinstance(created, dict) and created.get('id'):
+            obj['id'] = created['id']
+
+    def get_existing_topologies(self) -> List[Dict[str, Any]]:
+        """Get existing topologies from Edge Services to avoid conflicts"""
+        url = f'{self.base_url}/v1/topologies'
+        try:
+            response = self._make_request_with_retry('GET', url)
+            if response.status_code == 200:
+                topologies = loads(response.content)
+                return topologies if isinstance(topologies, list) else []
+        except Exception as e:
+            if self.verbose:
+                print(f"  Warning: Could not fetch existing topologies: {e}")
+        return []
 
     def get_existing_services(self) -> List[Dict[str, Any]]:
         """
@@ -506,7 +746,7 @@ class CampusControllerClient:
             response = self._make_request_with_retry('GET', url)
 
             if response.status_code == 200:
-                return response.json()
+                return loads(response.content)
             else:
                 if self.verbose:
                     print(f"Failed to retrieve services: {response.status_code}")
@@ -527,7 +767,7 @@ class CampusControllerClient:
         try:
             # Try to get services as a connectivity test
             url = f'{self.base_url}/v1/services'
-            response = self.session.get(url, timeout=10)
+            response = self._timed_request('GET', url, headers=self._auth_headers(), timeout=10)
             return response.status_code in [200, 401]  # 401 means connected but auth expired
         except Exception:
             return False
@@ -547,7 +787,7 @@ class CampusControllerClient:
             response = self._make_request_with_retry('GET', url)
 
             if response.status_code == 200:
-                profiles = response.json()
+                profiles = loads(response.content)
                 if self.verbose:
                     print(f"  Retrieved {len(profiles)} Associated Profiles")
                 return profiles if isinstance(profiles, list) else []
@@ -584,7 +824,7 @@ class CampusControllerClient:
                     print(f"    Error: Could not fetch profile {profile_id}")
                 return False
 
-            profile = response.json()
+            profile = loads(response.content)
 
             # Get existing radio assignments
             existing_radios = profile.get('radioIfList', [])
@@ -615,14 +855,88 @@ class CampusControllerClient:
                 print(f"    Error updating profile: {str(e)}")
             return False
 
-    def enable_all_services(self) -> int:
+    @staticmethod
+    def plan_profile_assignments(profile_assignments: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Invert service -> profile assignments into profile -> all new radio entries
+
+        Args:
+            profile_assignments: Service ID -> [{'profile_id', 'profile_name', 'radio_index'}]
+                                 (as returned by the profile selection step)
+
+        Returns:
+            Profile ID -> {'profile_name': str, 'ssid_assignments': [{'serviceId', 'index'}]}
+        """
+        plan: Dict[str, Dict[str, Any]] = {}
+        for service_id, assignments in profile_assignments.items():
+            for assignment in assignments:
+                group = plan.setdefault(assignment['profile_id'], {
+                    'profile_name': assignment.get('profile_name'),
+                    'ssid_assignments': []
+                })
+                entry = {'serviceId': service_id, 'index': assignment['radio_index']}
+                if entry not in group['ssid_assignments']:
+                    group['ssid_assignments'].append(entry)
+        return plan
+
+    def apply_profile_assignments(self, profile_assignments: Dict[str, List[Dict[str, Any]]],
+                                  max_workers: int = EDGE_POST_CONCURRENCY,
+                                  plan: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+        """
+        Apply SSID-to-profile assignments with one GET and one PUT per profile
+
+        All services assigned to a profile are merged into a single update, and
+        profiles are updated concurrently (up to max_workers at a time).
+
+        Args:
+            profile_assignments: Service ID -> [{'profile_id', 'profile_name', 'radio_index'}]
+            max_workers: Maximum number of profiles updated at the same time
+            plan: Result of plan_profile_assignments(profile_assignments), if the
+                  caller already computed it
+
+        Returns:
+            Number of assignments applied
         """
-        Enable all services (SSIDs) that are currently disabled
+        if plan is None:
+            plan = self.plan_profile_assignments(profile_assignments)
+        if not plan:
+            return 0
+
+        def apply(item):
+            profile_id, group = item
+            if self.verbose:
+                print(f"\n  Assigning {len(group['ssid_assignments'])} SSID radio(s) to profile '{group['profile_name']}'...")
+            if self.update_profile_ssid_assignments(profile_id, group['ssid_assignments']):
+                return len(group['ssid_assignments'])
+            return 0
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(plan)))) as executor:
+            return sum(executor.map(apply, plan.items()))
+
+    def enable_all_services(self, service_ids: Optional[Iterable[str]] = None,
+                            max_workers: int = EDGE_POST_CONCURRENCY) -> int:
+        """
+        Enable services (SSIDs) that are currently disabled
         This ensures SSIDs start broadcasting
 
+        Services are listed once; the disabled ones are then enabled with
+        concurrent PUTs (up to max_workers at a time). Services posted with
+        status 'enabled' are already broadcasting and need no PUT.
+
+        Args:
+            service_ids: Only enable these services (e.g. the ids created in this
+                         run, from post_configuration()['created']['services']);
+                         None enables every disabled service on the controller
+            max_workers: Maximum number of PUTs in flight
+
         Returns:
             Number of services successfully enabled
         """
+        if service_ids is not None:
+            service_ids = set(service_ids)
+            if not service_ids:
+                return 0
+
         try:
             # First, get all services
             url = f'{self.base_url}/v1/services'
@@ -633,38 +947,35 @@ class CampusControllerClient:
                     print(f"  Failed to get services: {response.status_code}")
                 return 0
 
-            services = response.json()
+            services = loads(response.content)
             if not isinstance(services, list):
                 return 0
 
-            enabled_count = 0
+            to_enable = [service for service in services
+                         if service.get('status', 'disabled') == 'disabled'
+                         and (service_ids is None or service.get('id') in service_ids)]
+            if not to_enable:
+                return 0
 
-            # Enable each disabled service
-            for service in services:
-                service_id = service.get('id')
+            def enable(service):
                 service_name = service.get('serviceName', 'Unknown')
-                current_status = service.get('status', 'disabled')
-
-                if current_status == 'disabled':
-                    if self.verbose:
-                        print(f"  Enabling service '{service_name}'...")
-
-                    # Update service status to enabled
-                    service['status'] = 'enabled'
+                if self.verbose:
+                    print(f"  Enabling service '{service_name}'...")
 
-                    # PUT the updated service
-                    update_url = f'{url}/{service_id}'
-                    update_response = self._make_request_with_retry('PUT', update_url, json=service)
+                # PUT the service back with status enabled
+                update_response = self._make_request_with_retry('PUT', f"{url}/{service.get('id')}",
+                                                                json=dict(service, status='enabled'))
 
-                    if update_response.status_code in [200, 204]:
-                        enabled_count += 1
-                        if self.verbose:
-                            print(f"    ✓ Enabled '{service_name}'")
-                    else:
-                        if self.verbose:
-                            print(f"    ✗ Failed to enable '{service_name}': {update_response.status_code}")
+                if update_response.status_code in [200, 204]:
+                    if self.verbose:
+                        print(f"    ✓ Enabled '{service_name}'")
+                    return True
+                if self.verbose:
+                    print(f"    ✗ Failed to enable '{service_name}': {update_response.status_code}")
+                return False
 
-            return enabled_count
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_enable)))) as executor:
+                return sum(executor.map(enable, to_enable))
 
         except Exception as e:
             if self.verbose:
@@ -7,10 +7,46 @@ Centralized configuration to avoid hardcoded values throughout the codebase
 MAX_PAGINATION_PAGES = 100  # Maximum pages to fetch in paginated requests
 DEFAULT_API_TIMEOUT = 30  # Default timeout for API requests in seconds
 DEFAULT_PAGE_LIMIT = 100  # Default items per page for paginated requests
+XIQ_PAGE_CONCURRENCY = 8  # Maximum pages fetched in parallel once total_pages is known
+XIQ_PARALLEL_COLLECTIONS = True  # Fetch independent XIQ collections concurrently in get_configuration()
+XIQ_ASYNC_MAX_CONNECTIONS = 100  # Connection limit for AsyncXIQAPIClient (requests in flight on one event loop)
+
+# XIQ rate limiting (token bucket in request_scheduler.py, tuned from RateLimit-* headers)
+XIQ_INITIAL_REQUEST_RATE = 20.0  # Requests per second until the server reports its limits
+XIQ_RATE_LIMIT_HEADROOM = 0.9  # Use at most this fraction of the reported limit
+XIQ_MAX_RETRIES = 5  # Retries for throttled (429/503) requests
+XIQ_MAX_RETRY_AFTER = 120  # Upper bound in seconds for a single Retry-After pause
+
+# RADIUS server endpoints, in order of preference (probed concurrently)
+XIQ_RADIUS_ENDPOINTS = ['/radius-servers/external', '/radius-servers', '/aaa-servers']
+
+# Local cache directory for the opt-in token cache and remembered per-tenant endpoints
+XIQ_CACHE_DIR = '~/.xiq-edge-migration'
+
+# Page checkpoints (--checkpoint-dir) older than this are discarded instead of resumed
+XIQ_CHECKPOINT_MAX_AGE = 24 * 3600
+
+# Bulk extraction (bulk_extractor.py) - tenants extracted at the same time, overall and per region
+XIQ_BULK_MAX_TENANTS = 8
+XIQ_BULK_PER_REGION = 4
+
+# Token cache (token_cache.py, opt-in) - reuse XIQ tokens until shortly before they expire
+XIQ_TOKEN_EXPIRY_MARGIN = 300  # Seconds before expiry at which a cached token is no longer used
+XIQ_TOKEN_DEFAULT_TTL = 3600  # Assumed lifetime for tokens without an exp claim
+XIQ_TOKEN_CHECK_ENDPOINT = '/network-policies?page=1&limit=1'  # Cheap authenticated GET that confirms a cached token
+
+# Server-side AP filter and field projection for GET /devices (falls back to a full fetch if rejected)
+XIQ_DEVICE_QUERY = {
+    'views': 'BASIC',
+    'deviceFunction': 'AP',
+    'fields': ['ID', 'SERIAL_NUMBER', 'HOSTNAME', 'MAC_ADDRESS', 'IP_ADDRESS', 'PRODUCT_TYPE',
+               'DEVICE_FUNCTION', 'CONNECTED', 'LOCATION', 'NETWORK_POLICY_ID']
+}
 
 # Edge Services Configuration
 EDGE_SERVICES_DEFAULT_PORT = 5825
 EDGE_SERVICES_BASE_PATH = '/management'
+EDGE_POST_CONCURRENCY = 8  # Maximum Edge Services requests in flight while posting configuration
 
 # Session Configuration
 SESSION_COOKIE_SECURE_PRODUCTION = True
@@ -38,7 +74,10 @@ REQUIRE_SECRET_KEY_IN_PRODUCTION = True
 MIN_PASSWORD_LENGTH = 8
 
 # Performance Configuration
-ENABLE_CONNECTION_POOLING = True
+ENABLE_CONNECTION_POOLING = True  # Keep-alive connection pools for both API clients (http_session.py)
+HTTP_POOL_CONNECTIONS = 4  # Number of hosts a session keeps connection pools for
+HTTP_POOL_MAXSIZE = 64  # Kept-alive connections per host - at least the number of concurrent requests
+HTTP2_ENABLED = False  # Send HTTPS requests over HTTP/2 (requires httpx[http2])
 ENABLE_RESPONSE_CACHING = True
 
 # Default Role IDs (Edge Services)
@@ -0,0 +1,127 @@
+"""
+Dependency Graph Executor
+Runs tasks that depend on each other on a thread pool, starting each task as
+soon as the tasks it depends on have finished
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Hashable, Iterable, List
+
+
+class DependencyGraph:
+    """
+    DAG of tasks run with bounded concurrency
+
+    Dependencies on keys that are not part of the graph count as already
+    satisfied (e.g. an object that exists on the target before the run).
+    A task whose dependency failed is not run; its result is the value
+    returned by the on_blocked callback instead.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, Callable[[], Any]] = {}
+        self._dependencies: Dict[Hashable, List[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._tasks
+
+    def add(self, key: Hashable, task: Callable[[], Any], depends_on: Iterable[Hashable] = ()):
+        """
+        Add a task
+
+        Args:
+            key: Unique task key
+            task: Zero-argument callable
+            depends_on: Keys of tasks that must finish first (unknown keys are ignored)
+        """
+        if key in self._tasks:
+            raise ValueError(f"Duplicate task {key!r}")
+        self._tasks[key] = task
+        self._dependencies[key] = [dep for dep in depends_on if dep is not None]
+
+    def run(self, max_workers: int, succeeded: Callable[[Any], bool] = bool,
+            on_blocked: Callable[[Hashable, List[Hashable]], Any] = None) -> Dict[Hashable, Any]:
+        """
+        Run all tasks
+
+        Args:
+            max_workers: Maximum number of tasks running at the same time
+            succeeded: Whether a task result satisfies its dependents (a task
+                       that raises never does)
+            on_blocked: Called with (key, failed dependency keys) for a task that
+                        is skipped; its return value becomes the task's result
+
+        Returns:
+            Mapping of task key to result (or the exception the task raised)
+
+        Raises:
+            ValueError: If the dependencies contain a cycle
+        """
+        results: Dict[Hashable, Any] = {}
+        waiting = {key: {dep for dep in deps if dep in self._tasks and dep != key}
+                   for key, deps in self._dependencies.items()}
+        dependents: Dict[Hashable, List[Hashable]] = {key: [] for key in self._tasks}
+        for key, deps in waiting.items():
+            for dep in deps:
+                dependents[dep].append(key)
+        failed_deps: Dict[Hashable, List[Hashable]] = {key: [] for key in self._tasks}
+
+        if not self._tasks:
+            return results
+        self._check_acyclic(waiting, dependents)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(self._tasks)))) as executor:
+            running = {}
+
+            def finish(key, result, ok):
+                results[key] = result
+                ready = []
+                for dependent in dependents[key]:
+                    if not ok:
+                        failed_deps[dependent].append(key)
+                    waiting[dependent].discard(key)
+                    if not waiting[dependent]:
+                        ready.append(dependent)
+                for dependent in ready:
+                    start(dependent)
+
+            def start(key):
+                if failed_deps[key]:
+                    blocked = on_blocked(key, failed_deps[key]) if on_blocked else None
+                    finish(key, blocked, False)
+                else:
+                    running[executor.submit(self._tasks[key])] = key
+
+            for key in [key for key, deps in waiting.items() if not deps]:
+                start(key)
+
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    try:
+                        result = future.result()
+                        ok = succeeded(result)
+                    except Exception as e:
+                        result, ok = e, False
+                    finish(key, result, ok)
+
+        return results
+
+    @staticmethod
+    def _check_acyclic(waiting: Dict[Hashable, set], dependents: Dict[Hashable, List[Hashable]]):
+        """Raise ValueError before anything runs if the tasks can't all be ordered"""
+        remaining = {key: len(deps) for key, deps in waiting.items()}
+        ready = [key for key, count in remaining.items() if count == 0]
+        while ready:
+            key = ready.pop()
+            for dependent in dependents[key]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        cycle = sorted(str(key) for key, count in remaining.items() if count > 0)
+        if cycle:
+            raise ValueError(f"Dependency cycle between tasks: {', '.join(cycle)}")
@@ -0,0 +1,101 @@
+"""
+Endpoint Cache
+Remembers which XIQ API endpoint variant works for each tenant, so later
+extractions can skip probing the alternatives
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+try:
+    from .json_codec import load_file, dumps_bytes
+    from .token_cache import jwt_claims
+except ImportError:
+    from json_codec import load_file, dumps_bytes
+    from token_cache import jwt_claims
+
+# Import configuration constants
+try:
+    from .config import XIQ_CACHE_DIR
+except ImportError:
+    # Fallback if config.py doesn't exist
+    XIQ_CACHE_DIR = '~/.xiq-edge-migration'
+
+
+def tenant_key(api_token: str, base_url: str) -> str:
+    """
+    Identify the XIQ tenant (and region) an API token belongs to
+
+    XIQ access tokens are JWTs; the owner/org claim identifies the tenant.
+    The payload is only decoded, never verified - it is used as a cache key.
+    Tokens that cannot be decoded fall back to a hash of the token itself.
+
+    Args:
+        api_token: XIQ access token
+        base_url: Regional API base URL
+
+    Returns:
+        Stable key such as 'https://api.extremecloudiq.com|owner:12345'
+    """
+    owner = None
+    claims = jwt_claims(api_token)
+    for claim in ('owner_id', 'ownerId', 'org_id', 'orgId', 'customer_id', 'sub'):
+        if claims.get(claim) is not None:
+            owner = f"{claim}:{claims[claim]}"
+            break
+
+    if owner is None:
+        owner = 'token:' + hashlib.sha256(api_token.encode('utf-8')).hexdigest()[:16]
+    return f"{base_url.rstrip('/')}|{owner}"
+
+
+class EndpointCache:
+    """
+    Small JSON file mapping tenant -> {purpose: endpoint}
+
+    Opt-in: clients only use it when one is passed to them (--cache-endpoints).
+    Read and write failures are ignored - the cache only saves probing time,
+    so a missing or unwritable file just means probing again.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the endpoint cache
+
+        Args:
+            path: JSON file to keep the remembered endpoints in (default: XIQ_CACHE_DIR/endpoints.json)
+        """
+        self.path = path or os.path.join(os.path.expanduser(XIQ_CACHE_DIR or '~/.xiq-edge-migration'), 'endpoints.json')
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        try:
+            data = load_file(self.path)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, tenant: str, purpose: str) -> Optional[str]:
+        """Return the remembered endpoint for a tenant, or None"""
+        with self._lock:
+            return self._load().get(tenant, {}).get(purpose)
+
+    def set(self, tenant: str, purpose: str, endpoint: str):
+        """Remember the endpoint that worked for a tenant"""
+        with self._lock:
+            data = self._load()
+            if data.get(tenant, {}).get(purpose) == endpoint:
+                return
+            data.setdefault(tenant, {})[purpose] = endpoint
+            try:
+                directory = os.path.dirname(self.path) or '.'
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.endpoints-', suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(dumps_bytes(data, pretty=True))
+                os.replace(tmp_path, self.path)
+            except OSError:
+                pass
@@ -4,10 +4,14 @@ Handles exporting configurations to various formats (CSV, JSON, etc.)
 """
 
 import csv
-import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable
 from pathlib import Path
 
+try:
+    from .json_codec import dump_file, dumps_bytes
+except ImportError:
+    from json_codec import dump_file, dumps_bytes
+
 
 def export_to_json(data: Dict[str, Any], output_file: str, pretty: bool = True):
     """
@@ -16,21 +20,40 @@ def export_to_json(data: Dict[str, Any], output_file: str, pretty: bool = True):
     Args:
         data: Dictionary to export
         output_file: Output file path
-        pretty: Whether to pretty-print (indent) the JSON
+        pretty: Whether to pretty-print (indent) the JSON; compact output otherwise
+    """
+    dump_file(data, output_file, pretty)
+
+
+def export_to_jsonl(records: Iterable[Dict[str, Any]], output_file: str) -> int:
+    """
+    Export records to a JSON Lines file, one object per line
+
+    Records are written as they are consumed, so a generator such as
+    XIQAPIClient.iter_devices() is streamed to disk in constant memory.
+
+    Args:
+        records: Iterable of records to export
+        output_file: Output file path
+
+    Returns:
+        Number of records written
     """
-    with open(output_file, 'w') as f:
-        if pretty:
-            json.dump(data, f, indent=2)
-        else:
-            json.dump(data, f)
+    count = 0
+    with open(output_file, 'wb') as f:
+        for record in records:
+            f.write(dumps_bytes(record))
+            f.write(b'\n')
+            count += 1
+    return count
 
 
-def export_ssids_to_csv(ssids: List[Dict[str, Any]], output_file: str):
+def export_ssids_to_csv(ssids: Iterable[Dict[str, Any]], output_file: str):
     """
     Export SSIDs to CSV format
 
     Args:
-        ssids: List of SSID configurations
+        ssids: List (or iterable, e.g. XIQAPIClient.iter_ssids()) of SSID configurations
         output_file: Output CSV file path
     """
     if not ssids:
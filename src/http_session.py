@@ -0,0 +1,113 @@
+"""
+HTTP Session Builder
+Builds the requests sessions used by the XIQ and Edge Services clients with
+connection pools sized for concurrent requests, keep-alive reuse and optional
+HTTP/2 (via httpx, when installed)
+"""
+
+import requests
+from requests.adapters import HTTPAdapter, BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+    import h2  # noqa: F401 - httpx needs it for http2=True
+except ImportError:
+    # httpx[http2] is optional - only needed for HTTP2_ENABLED
+    httpx = None
+
+# Import configuration constants
+try:
+    from .config import ENABLE_CONNECTION_POOLING, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP2_ENABLED
+except ImportError:
+    # Fallback if config.py doesn't exist
+    ENABLE_CONNECTION_POOLING = True
+    HTTP_POOL_CONNECTIONS = 4
+    HTTP_POOL_MAXSIZE = 64
+    HTTP2_ENABLED = False
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    requests transport adapter that sends requests over HTTP/2 with httpx
+
+    All requests mounted on this adapter share one httpx.Client, so they are
+    multiplexed over a small number of connections per host.
+    """
+
+    def __init__(self, verify: bool = True, pool_maxsize: int = HTTP_POOL_MAXSIZE):
+        super().__init__()
+        self._client = httpx.Client(
+            http2=True,
+            verify=verify,
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+        )
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+            timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+
+        body = request.body
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        try:
+            # Connection-specific headers are not allowed in HTTP/2
+            headers = {k: v for k, v in request.headers.items() if k.lower() not in ('connection', 'keep-alive')}
+            result = self._client.request(request.method, request.url, headers=headers, content=body, timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+        response = requests.Response()
+        response.status_code = result.status_code
+        response.reason = result.reason_phrase
+        response.headers = CaseInsensitiveDict(result.headers)
+        response.encoding = result.encoding
+        response.url = str(result.url)
+        response.request = request
+        response._content = result.content
+        return response
+
+    def close(self):
+        self._client.close()
+
+
+def build_session(verify_ssl: bool = True, pool_maxsize: int = HTTP_POOL_MAXSIZE, http2: bool = HTTP2_ENABLED,
+                  verbose: bool = False) -> requests.Session:
+    """
+    Create a requests session for one API client
+
+    With ENABLE_CONNECTION_POOLING, kept-alive connections are reused from a
+    pool of up to pool_maxsize connections per host, so concurrent requests
+    don't open and discard connections once the default pool of 10 is
+    exhausted. With pooling disabled every request closes its connection.
+
+    Args:
+        verify_ssl: Whether to verify SSL certificates
+        pool_maxsize: Maximum kept-alive connections per host
+        http2: Send HTTPS requests over HTTP/2 (requires httpx[http2]; falls
+               back to HTTP/1.1 with a warning when not installed)
+        verbose: Enable verbose logging
+
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    session.verify = verify_ssl
+
+    if not ENABLE_CONNECTION_POOLING:
+        session.headers['Connection'] = 'close'
+        return session
+
+    if http2 and httpx is None and verbose:
+        print("  ⚠ HTTP/2 requested but httpx[http2] is not installed - using HTTP/1.1")
+
+    if http2 and httpx is not None:
+        session.mount('https://', HTTP2Adapter(verify=verify_ssl, pool_maxsize=pool_maxsize))
+    else:
+        session.mount('https://', HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=pool_maxsize))
+    session.mount('http://', HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=pool_maxsize))
+    return session
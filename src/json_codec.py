@@ -0,0 +1,103 @@
+"""
+JSON Codec
+One place for JSON encoding/decoding: uses orjson when installed, msgspec for
+decoding when orjson is not, and falls back to the standard library. Works on
+bytes end to end, so response bodies and output files skip intermediate str copies.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    BACKEND = 'orjson'
+elif msgspec is not None:
+    BACKEND = 'msgspec'
+else:
+    BACKEND = 'json'
+
+
+def _default(obj: Any) -> Any:
+    """Encode objects the backends don't know, such as compact XIQ records"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if msgspec is not None:
+    _msgspec_decoder = msgspec.json.Decoder()
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    Decode JSON
+
+    Args:
+        data: JSON document as bytes (preferred - e.g. response.content) or str
+
+    Returns:
+        Decoded Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        return _msgspec_decoder.decode(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, pretty: bool = False) -> bytes:
+    """
+    Encode an object as UTF-8 JSON bytes
+
+    Args:
+        obj: Object to encode (objects with to_dict() are supported)
+        pretty: Indent with two spaces; compact output otherwise
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        # Dataclass records go through to_dict() so private fields stay out
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    # msgspec would encode the private fields of dataclass records, so it is
+    # only used for decoding
+    if pretty:
+        return json.dumps(obj, indent=2, default=_default).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    """Encode an object as a JSON string (see dumps_bytes)"""
+    return dumps_bytes(obj, pretty).decode('utf-8')
+
+
+def load_file(path: str) -> Any:
+    """Read and decode a JSON file"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def dump_file(obj: Any, path: str, pretty: bool = True):
+    """
+    Encode an object and write it to a JSON file
+
+    Args:
+        obj: Object to encode
+        path: Output file path
+        pretty: Indent with two spaces; compact output otherwise
+    """
+    data = dumps_bytes(obj, pretty)
+    with open(path, 'wb') as f:
+        f.write(data)
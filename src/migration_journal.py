@@ -0,0 +1,141 @@
+"""
+Migration Journal
+Append-only JSONL record of completed Edge Services operations, so an
+interrupted post_configuration can resume with only the unfinished work
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    from .json_codec import loads, dumps_bytes
+except ImportError:
+    from json_codec import loads, dumps_bytes
+
+# Outcomes after which an operation does not have to be sent again
+DONE_STATUSES = ('posted', 'updated', 'skipped', 'resumed')
+
+_UUID = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+
+def _without_uuids(value: Any) -> Any:
+    """Drop UUID strings - the converter generates new ones on every run"""
+    if isinstance(value, dict):
+        return {k: _without_uuids(v) for k, v in value.items() if not (isinstance(v, str) and _UUID.match(v))}
+    if isinstance(value, list):
+        return [_without_uuids(v) for v in value if not (isinstance(v, str) and _UUID.match(v))]
+    return value
+
+
+def payload_hash(payload: Dict[str, Any]) -> str:
+    """
+    Hash an object's content, ignoring its (per-run) UUIDs
+
+    Two conversions of the same XIQ configuration produce the same hash, while
+    any change to names, VLANs, security settings etc. produces a new one.
+    """
+    encoded = json.dumps(_without_uuids(payload), sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class MigrationJournal:
+    """
+    Write-ahead journal of post_configuration operations
+
+    One JSON line per finished operation: object type, key (name or AP
+    serial), payload hash, controller id and status. Each line is flushed and
+    fsynced before the next dependent operation starts, so after a crash the
+    journal lists exactly the operations that completed. When resuming, the
+    last entry per (type, key) wins; an operation is only skipped if it
+    completed and its payload hash is unchanged.
+    """
+
+    def __init__(self, path: str, resume: bool = False, verbose: bool = False):
+        """
+        Open the journal
+
+        Args:
+            path: JSONL journal file
+            resume: Load the existing journal and keep appending to it;
+                    otherwise an existing journal is started over
+            verbose: Enable verbose logging
+        """
+        self.path = path
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        if resume:
+            self._load()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'ab' if resume else 'wb')
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                entry = loads(line)
+            except ValueError:
+                # A torn last line from a crash - that operation is redone
+                continue
+            if isinstance(entry, dict) and 'type' in entry and 'key' in entry:
+                self._entries[(entry['type'], str(entry['key']))] = entry
+
+        if self.verbose:
+            done = sum(1 for entry in self._entries.values() if entry.get('status') in DONE_STATUSES)
+            print(f"  Resuming from journal {self.path}: {done} operations already completed")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def completed(self, kind: str, key: Any, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Return the journal entry of an operation that already completed with this payload
+
+        Args:
+            kind: Object type (configuration key)
+            key: Object name or AP serial
+            payload: Object about to be sent
+
+        Returns:
+            Journal entry (with the controller 'id'), or None if it must be sent
+        """
+        entry = self._entries.get((kind, str(key)))
+        if entry and entry.get('status') in DONE_STATUSES and entry.get('hash') == payload_hash(payload):
+            return entry
+        return None
+
+    def record(self, kind: str, key: Any, payload: Dict[str, Any], status: str, object_id: Optional[str] = None):
+        """Append one finished operation and flush it to disk"""
+        entry = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'type': kind,
+            'key': str(key),
+            'hash': payload_hash(payload),
+            'id': object_id,
+            'status': status
+        }
+        line = dumps_bytes(entry) + b'\n'
+        with self._lock:
+            self._entries[(kind, str(key))] = entry
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """Close the journal file"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
@@ -0,0 +1,232 @@
+"""
+Request Scheduler
+Token-bucket pacing for XIQ API calls that learns the allowed rate from
+RateLimit response headers and 429 Retry-After responses
+"""
+
+import asyncio
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Mapping, Tuple
+
+# Import configuration constants
+try:
+    from .config import XIQ_INITIAL_REQUEST_RATE, XIQ_RATE_LIMIT_HEADROOM, XIQ_MAX_RETRY_AFTER
+except ImportError:
+    # Fallback if config.py doesn't exist
+    XIQ_INITIAL_REQUEST_RATE = 20.0
+    XIQ_RATE_LIMIT_HEADROOM = 0.9
+    XIQ_MAX_RETRY_AFTER = 120
+
+# Never slow down below this many requests per second
+MIN_REQUEST_RATE = 0.2
+
+
+def _header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    """Look up RateLimit-<name>, falling back to the older X-RateLimit-<name>"""
+    value = headers.get(f'RateLimit-{name}')
+    if value is None:
+        value = headers.get(f'X-RateLimit-{name}')
+    return value
+
+
+def _first_int(value: Optional[str]) -> Optional[int]:
+    """Parse the leading integer of a header value such as '7500, 7500;w=3600'"""
+    if value is None:
+        return None
+    match = re.match(r'\s*(\d+)', str(value))
+    return int(match.group(1)) if match else None
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> Tuple[Optional[int], Optional[int], Optional[float], Optional[float]]:
+    """
+    Parse rate-limit response headers
+
+    Understands both the IETF draft form (RateLimit-Limit: 7500, 7500;w=3600)
+    and the common X-RateLimit-* form. A reset value larger than a year is
+    treated as an epoch timestamp rather than a number of seconds.
+
+    Returns:
+        (limit, remaining, reset_seconds, window_seconds), each None if absent
+    """
+    limit_header = _header(headers, 'Limit')
+    limit = _first_int(limit_header)
+    remaining = _first_int(_header(headers, 'Remaining'))
+
+    reset = None
+    reset_value = _first_int(_header(headers, 'Reset'))
+    if reset_value is not None:
+        reset = float(reset_value)
+        if reset > 365 * 24 * 3600:
+            reset = max(0.0, reset - time.time())
+
+    window = None
+    if limit_header:
+        match = re.search(r'w=(\d+)', limit_header)
+        if match:
+            window = float(match.group(1))
+
+    return limit, remaining, reset, window
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitScheduler:
+    """
+    Thread-safe token bucket shared by every request of one client
+
+    Each request takes a token before it is sent. The bucket starts at
+    initial_rate; once the server reports its limits the refill rate becomes
+    limit/window (RateLimit-Limit with w=) or what remains spread over the
+    time until the counter resets, both scaled by headroom. When only the
+    headroom reserve remains, all callers pause until the reset. A 429 pauses
+    all callers until Retry-After has passed and halves the rate; when no
+    limit headers are available, successful responses raise the rate again
+    (additive increase, also past initial_rate) until the next 429.
+    """
+
+    def __init__(self, initial_rate: float = XIQ_INITIAL_REQUEST_RATE, burst: Optional[float] = None,
+                 headroom: float = XIQ_RATE_LIMIT_HEADROOM, verbose: bool = False):
+        """
+        Initialize the scheduler
+
+        Args:
+            initial_rate: Requests per second before any limit has been learned
+            burst: Bucket capacity (defaults to one second worth of requests)
+            headroom: Fraction of the server's limit to use (stay just below it)
+            verbose: Enable verbose logging
+        """
+        self.rate = max(MIN_REQUEST_RATE, float(initial_rate))
+        self.capacity = max(1.0, float(burst) if burst else self.rate)
+        self.headroom = headroom
+        self.verbose = verbose
+
+        self.learned_from_headers = False
+        self.throttle_count = 0
+
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._updated)
+        self._updated = max(self._updated, now)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def try_acquire(self) -> float:
+        """
+        Take a token without blocking
+
+        Returns:
+            0 if a request may be sent now, otherwise seconds to wait before trying again
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request may be sent"""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def observe(self, headers: Mapping[str, str]):
+        """Learn the allowed rate from a response's rate-limit headers"""
+        limit, remaining, reset, window = parse_rate_limit_headers(headers)
+        if limit is None and remaining is None:
+            with self._lock:
+                # No headers - probe for a higher sustainable rate (additive increase)
+                if not self.learned_from_headers:
+                    self.rate += 0.1
+            return
+
+        exhausted = False
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            reserve = (limit or remaining) * (1 - self.headroom)
+            if limit is not None and window:
+                self.rate = max(MIN_REQUEST_RATE, limit * self.headroom / window)
+                self.capacity = max(1.0, limit - reserve)
+            elif remaining is not None and reset:
+                # No window length - spread what remains over the time until the counter resets
+                self.rate = max(MIN_REQUEST_RATE, (remaining - reserve) / reset)
+                self.capacity = max(1.0, self.rate)
+            if remaining is not None:
+                # The server's count is authoritative - spend what it allows, minus the headroom
+                self._tokens = min(self.capacity, max(0.0, remaining - reserve))
+                if reset and remaining <= reserve:
+                    # Only the reserve is left - wait for the counter to reset, at most
+                    # XIQ_MAX_RETRY_AFTER at a time (the next response re-checks the count)
+                    pause = min(reset, XIQ_MAX_RETRY_AFTER)
+                    exhausted = now >= self._paused_until
+                    self._paused_until = max(self._paused_until, now + pause)
+                    self._tokens = 1.0
+                    self._updated = self._paused_until
+            self.learned_from_headers = True
+
+        if exhausted:
+            # Always shown - otherwise a long pause looks like a hang
+            print(f"    XIQ rate limit nearly used up - waiting {pause:.0f}s before sending more requests")
+
+    def throttled(self, retry_after: Optional[str], attempt: int) -> float:
+        """
+        Record a throttled (429) response
+
+        Args:
+            retry_after: Retry-After header value, if any
+            attempt: Zero-based retry attempt (used for backoff without Retry-After)
+
+        Returns:
+            Seconds all callers will wait before the next request
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = min(XIQ_MAX_RETRY_AFTER, 2 ** attempt)
+        delay = min(delay, XIQ_MAX_RETRY_AFTER)
+
+        with self._lock:
+            self.throttle_count += 1
+            now = time.monotonic()
+            # Multiplicative decrease - once per pause, since requests that were
+            # already in flight tend to be throttled together
+            if now >= self._paused_until:
+                self.rate = max(MIN_REQUEST_RATE, self.rate / 2)
+            self._paused_until = max(self._paused_until, now + delay)
+            # Resume with a single token (no refill credit for the pause itself)
+            self._tokens = 1.0
+            self._updated = self._paused_until
+
+        if self.verbose:
+            print(f"    Throttled by XIQ - pausing {delay:.1f}s, pacing at {self.rate:.2f} requests/s")
+        return delay
@@ -0,0 +1,191 @@
+"""
+XIQ Token Cache
+Opt-in encrypted on-disk cache of XIQ access tokens, so repeated runs can skip
+the /login round trip while a token is still valid
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Optional
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    # cryptography is optional - without it tokens are never written to disk
+    Fernet = None
+    InvalidToken = Exception
+
+try:
+    from .json_codec import loads, dumps_bytes
+except ImportError:
+    from json_codec import loads, dumps_bytes
+
+# Import configuration constants
+try:
+    from .config import XIQ_CACHE_DIR, XIQ_TOKEN_EXPIRY_MARGIN, XIQ_TOKEN_DEFAULT_TTL
+except ImportError:
+    # Fallback if config.py doesn't exist
+    XIQ_CACHE_DIR = '~/.xiq-edge-migration'
+    XIQ_TOKEN_EXPIRY_MARGIN = 300
+    XIQ_TOKEN_DEFAULT_TTL = 3600
+
+# Environment variable that may hold the Fernet key instead of the key file
+TOKEN_CACHE_KEY_ENV = 'XIQ_TOKEN_CACHE_KEY'
+
+
+def jwt_claims(token: str) -> Dict[str, Any]:
+    """
+    Decode the claims of a JWT without verifying it
+
+    Returns:
+        Claims dictionary, or {} if the token is not a decodable JWT
+    """
+    parts = token.split('.')
+    if len(parts) != 3:
+        return {}
+    try:
+        payload = parts[1] + '=' * (-len(parts[1]) % 4)
+        claims = loads(base64.urlsafe_b64decode(payload))
+        return claims if isinstance(claims, dict) else {}
+    except (ValueError, TypeError):
+        return {}
+
+
+def token_expiry(token: str) -> float:
+    """Return when a token expires (epoch seconds), from its exp claim or XIQ_TOKEN_DEFAULT_TTL"""
+    exp = jwt_claims(token).get('exp')
+    if isinstance(exp, (int, float)):
+        return float(exp)
+    return time.time() + XIQ_TOKEN_DEFAULT_TTL
+
+
+class TokenCache:
+    """
+    Fernet-encrypted token store keyed by user, password and region
+
+    The password is part of the (HMAC) key, so a cached token is only handed
+    out to someone who could have logged in anyway. Tokens are dropped
+    XIQ_TOKEN_EXPIRY_MARGIN seconds before they expire. Without the
+    cryptography package the cache is disabled rather than storing tokens
+    in plain text.
+    """
+
+    def __init__(self, path: Optional[str] = None, key: Optional[bytes] = None, verbose: bool = False):
+        """
+        Initialize the token cache
+
+        Args:
+            path: Encrypted cache file (default: XIQ_CACHE_DIR/tokens.enc)
+            key: Fernet key; defaults to $XIQ_TOKEN_CACHE_KEY, else a key file
+                 created next to the cache with owner-only permissions
+            verbose: Enable verbose logging
+        """
+        cache_dir = os.path.expanduser(XIQ_CACHE_DIR or '~/.xiq-edge-migration')
+        self.path = path or os.path.join(cache_dir, 'tokens.enc')
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self._fernet = None
+        self._key = None
+
+        if Fernet is None:
+            if verbose:
+                print("  ⚠ Token cache disabled: install 'cryptography' to enable it")
+            return
+
+        try:
+            self._key = key or os.environ.get(TOKEN_CACHE_KEY_ENV, '').encode() or self._load_or_create_key()
+            self._fernet = Fernet(self._key)
+        except (OSError, ValueError) as e:
+            if verbose:
+                print(f"  ⚠ Token cache disabled: {e}")
+            self._fernet = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._fernet is not None
+
+    def _load_or_create_key(self) -> bytes:
+        key_path = os.path.join(os.path.dirname(self.path), 'token.key')
+        try:
+            with open(key_path, 'rb') as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(os.path.dirname(key_path), exist_ok=True)
+        key = Fernet.generate_key()
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key)
+        return key
+
+    def _entry_key(self, username: str, password: str, base_url: str) -> str:
+        message = f"{username.strip().lower()}|{password}|{base_url.rstrip('/')}".encode('utf-8')
+        return hmac.new(self._key, message, hashlib.sha256).hexdigest()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'rb') as f:
+                data = loads(self._fernet.decrypt(f.read()))
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError, InvalidToken):
+            # Missing, corrupt or encrypted with another key - start empty
+            return {}
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tokens-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._fernet.encrypt(dumps_bytes(entries)))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def get(self, username: str, password: str, base_url: str) -> Optional[str]:
+        """
+        Return a cached token that is still valid, or None
+
+        Args:
+            username: XIQ username
+            password: XIQ password
+            base_url: Regional API base URL
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._read().get(self._entry_key(username, password, base_url))
+        if not entry or entry.get('expires_at', 0) - XIQ_TOKEN_EXPIRY_MARGIN <= time.time():
+            return None
+        return entry.get('token')
+
+    def put(self, username: str, password: str, base_url: str, token: str):
+        """Store a freshly issued token (expired entries are pruned on write)"""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            entries = {key: entry for key, entry in self._read().items() if entry.get('expires_at', 0) > now}
+            entries[self._entry_key(username, password, base_url)] = {
+                'token': token,
+                'expires_at': token_expiry(token)
+            }
+            self._write(entries)
+
+    def invalidate(self, username: str, password: str, base_url: str):
+        """Forget the token for a user (e.g. after XIQ rejected it)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            entries = self._read()
+            if entries.pop(self._entry_key(username, password, base_url), None) is not None:
+                self._write(entries)
@@ -5,25 +5,110 @@ Based on ExtremeCloud IQ Extractor patterns
 """
 
 import requests
-import json
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable, Tuple, Iterator
 import warnings
 
 # Import configuration constants
 try:
-    from .config import MAX_PAGINATION_PAGES, DEFAULT_API_TIMEOUT
+    from .config import MAX_PAGINATION_PAGES, DEFAULT_API_TIMEOUT, DEFAULT_PAGE_LIMIT, XIQ_PAGE_CONCURRENCY, XIQ_PARALLEL_COLLECTIONS, XIQ_DEVICE_QUERY, XIQ_MAX_RETRIES, \
+        XIQ_RADIUS_ENDPOINTS, XIQ_TOKEN_CHECK_ENDPOINT
 except ImportError:
     # Fallback if config.py doesn't exist
     MAX_PAGINATION_PAGES = 100
     DEFAULT_API_TIMEOUT = 30
+    DEFAULT_PAGE_LIMIT = 100
+    XIQ_PAGE_CONCURRENCY = 8
+    XIQ_PARALLEL_COLLECTIONS = True
+    XIQ_DEVICE_QUERY = {}
+    XIQ_MAX_RETRIES = 5
+    XIQ_RADIUS_ENDPOINTS = ['/radius-servers/external', '/radius-servers', '/aaa-servers']
+    XIQ_TOKEN_CHECK_ENDPOINT = '/network-policies?page=1&limit=1'
+
+try:
+    from .api_stats import APIStats
+except ImportError:
+    from api_stats import APIStats
+
+try:
+    from .http_session import build_session
+except ImportError:
+    from http_session import build_session
+
+try:
+    from .json_codec import loads, dump_file
+except ImportError:
+    from json_codec import loads, dump_file
+
+try:
+    from .token_cache import TokenCache
+except ImportError:
+    from token_cache import TokenCache
+
+try:
+    from .xiq_records import RawPayloadStore, compact_record
+except ImportError:
+    from xiq_records import RawPayloadStore, compact_record
+
+try:
+    from .xiq_checkpoint import PageCheckpointStore
+except ImportError:
+    from xiq_checkpoint import PageCheckpointStore
+
+try:
+    from .endpoint_cache import EndpointCache, tenant_key
+except ImportError:
+    from endpoint_cache import EndpointCache, tenant_key
+
+try:
+    from .request_scheduler import RateLimitScheduler
+except ImportError:
+    from request_scheduler import RateLimitScheduler
+
+try:
+    from .xiq_snapshot_diff import diff_configurations
+except ImportError:
+    from xiq_snapshot_diff import diff_configurations
+
+try:
+    from .xiq_config import XIQConfig
+except ImportError:
+    from xiq_config import XIQConfig
 
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 
+# Reference fields followed when extracting a single network policy
+# (a field may hold an id, an object with an 'id', or a list of either)
+USER_PROFILE_REFERENCE_KEYS = ('default_user_profile', 'default_user_profile_id', 'user_profile_id', 'user_profile_ids')
+RADIUS_CLIENT_REFERENCE_KEYS = ('default_radius_client_object_id', 'radius_client_object_id', 'radius_client_object_ids')
+RADIUS_SERVER_REFERENCE_KEYS = ('radius_server_id', 'radius_server_ids', 'external_radius_server_id',
+                                'external_radius_server', 'radius_server')
+
+
+class IncompleteCollection(list):
+    """Items of a collection whose page walk failed part-way (never cached)"""
+
+
+class IncompleteExtractionError(Exception):
+    """Raised when collections were cut short because pages failed after all retries"""
+
+    def __init__(self, endpoints: List[str]):
+        self.endpoints = endpoints
+        super().__init__(f"Incomplete XIQ extraction - pages of {', '.join(endpoints)} failed after all retries; "
+                         f"re-run to fetch the missing data")
+
 
 class XIQAPIClient:
     """Client for interacting with Extreme Cloud IQ API"""
 
-    def __init__(self, api_token: str, base_url: str = "https://api.extremecloudiq.com", verify_ssl: bool = True, verbose: bool = False):
+    def __init__(self, api_token: str, base_url: str = "https://api.extremecloudiq.com", verify_ssl: bool = True, verbose: bool = False,
+                 page_concurrency: int = XIQ_PAGE_CONCURRENCY, compact: bool = False, raw_store_path: Optional[str] = None,
+                 checkpoint_dir: Optional[str] = None, session: Optional[requests.Session] = None,
+                 stats: Optional[APIStats] = None, endpoint_cache: Optional[EndpointCache] = None):
         """
         Initialize XIQ API client with existing API token
 
@@ -32,19 +117,66 @@ class XIQAPIClient:
             base_url: API base URL (default: https://api.extremecloudiq.com)
             verify_ssl: Whether to verify SSL certificates
             verbose: Enable verbose logging
+            page_concurrency: Maximum number of pages fetched in parallel (1 = sequential)
+            compact: Return slotted records (see xiq_records) without the 'original' payload
+            raw_store_path: In compact mode, spill raw payloads to this file so
+                            record.original can still load them on demand
+            checkpoint_dir: Checkpoint every completed page into this run directory and
+                            reuse this tenant's pages already there (resumes an interrupted
+                            extraction; runs older than XIQ_CHECKPOINT_MAX_AGE start over)
+            session: Existing session to reuse (e.g. the one login() authenticated with);
+                     a pooled session from http_session.build_session() otherwise
+            stats: APIStats to record requests in (share one across clients for a
+                   single report); a new one is created otherwise
+            endpoint_cache: Optional EndpointCache remembering which endpoint variants work
+                            for this tenant across runs (nothing is written to disk without it)
         """
         self.base_url = base_url
         self.verify_ssl = verify_ssl
         self.verbose = verbose
+        self.page_concurrency = max(1, page_concurrency)
+        self.compact = compact
+        self.raw_store = RawPayloadStore(raw_store_path) if compact and raw_store_path else None
         self.headers = {
             "Authorization": f"Bearer {api_token}",
             "Content-Type": "application/json"
         }
-        self.session = requests.Session()
-        self.session.verify = verify_ssl
+        self.session = session or build_session(verify_ssl, verbose=verbose)
+        self.stats = stats if stats is not None else APIStats()
+
+        # Tenant (and region) of the token - page checkpoints and remembered endpoints are kept per tenant
+        self.tenant = tenant_key(api_token, base_url)
+        self.checkpoints = PageCheckpointStore(checkpoint_dir, self.tenant, verbose) if checkpoint_dir else None
+
+        # Remembers which endpoint variants work for this tenant across runs (opt-in)
+        self.endpoint_cache = endpoint_cache
+
+        # Paces all requests (including parallel page fetches) below XIQ's rate limit
+        self.scheduler = RateLimitScheduler(verbose=verbose)
+
+        # Collections cut short by failed pages since the outermost cached_extraction() began
+        self.incomplete_collections: set = set()
+
+        # Response cache - only active inside cached_extraction()
+        self._response_cache: Optional[Dict[Tuple, Future]] = None
+        self._cache_depth = 0
+        self._cache_lock = threading.Lock()
+
+    def close(self):
+        """Close the HTTP session and the raw payload store (raw payloads can no longer be read)"""
+        self.session.close()
+        if self.raw_store is not None:
+            self.raw_store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     @classmethod
-    def login(cls, username: str, password: str, base_url: str = "https://api.extremecloudiq.com", verify_ssl: bool = True, verbose: bool = False):
+    def login(cls, username: str, password: str, base_url: str = "https://api.extremecloudiq.com", verify_ssl: bool = True, verbose: bool = False,
+              token_cache: Optional[TokenCache] = None, use_cached_token: bool = True, **client_options):
         """
         Authenticate with username and password to get access token
 
@@ -54,6 +186,11 @@ class XIQAPIClient:
             base_url: API base URL (default: https://api.extremecloudiq.com)
             verify_ssl: Whether to verify SSL certificates
             verbose: Enable verbose logging
+            token_cache: Optional TokenCache; a cached token that XIQ still accepts skips the /login call
+            use_cached_token: Set to False to always verify the password with /login (the fresh
+                              token is still stored in token_cache)
+            **client_options: Extra client arguments (page_concurrency, compact, raw_store_path, checkpoint_dir,
+                              stats, endpoint_cache)
 
         Returns:
             XIQAPIClient instance
@@ -64,20 +201,21 @@ class XIQAPIClient:
         if verbose:
             print("  Authenticating to ExtremeCloud IQ...")
 
-        # Validate inputs
-        if not username or not isinstance(username, str):
-            raise Exception("Username is required and must be a string")
-
-        if not password or not isinstance(password, str):
-            raise Exception("Password is required and must be a string")
+        username, password = cls._clean_credentials(username, password)
 
-        # Clean inputs (strip whitespace)
-        username = username.strip()
-        password = password.strip()
+        # The client reuses this session, so the TLS connection opened at login stays in use
+        session = build_session(verify_ssl, verbose=verbose)
 
-        # Basic email format validation
-        if '@' not in username or '.' not in username.split('@')[1]:
-            raise Exception("Username must be a valid email address (e.g., user@example.com)")
+        if token_cache and use_cached_token:
+            cached_token = token_cache.get(username, password, base_url)
+            if cached_token:
+                if cls._token_accepted(session, cached_token, base_url, verify_ssl):
+                    if verbose:
+                        print("  ✓ Using cached access token")
+                    return cls(cached_token, base_url, verify_ssl, verbose, session=session, **client_options)
+                token_cache.invalidate(username, password, base_url)
+                if verbose:
+                    print("  ⚠ Cached access token was rejected - logging in again")
 
         login_url = f"{base_url}/login"
 
@@ -87,46 +225,26 @@ class XIQAPIClient:
         }
 
         try:
-            response = requests.post(
+            started = time.perf_counter()
+            response = session.post(
                 login_url,
                 json=payload,
                 verify=verify_ssl,
                 headers={'Content-Type': 'application/json'},
                 timeout=30
             )
+            if client_options.get('stats') is not None:
+                client_options['stats'].record('POST', '/login', response.status_code, time.perf_counter() - started,
+                                               bytes_received=len(response.content))
 
-            # Handle various error responses
-            if response.status_code == 401:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get('error_message', 'Invalid credentials')
-                    raise Exception(f"Authentication failed: {error_msg}")
-                except ValueError:
-                    raise Exception("Authentication failed: Invalid username or password")
-
-            if response.status_code >= 400:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get('error_message', error_data.get('message', response.text))
-                    raise Exception(f"XIQ API Error: {error_msg}")
-                except ValueError:
-                    raise Exception(f"XIQ API Error (HTTP {response.status_code}): {response.text[:200]}")
-
-            # Parse successful response
-            try:
-                data = response.json()
-            except ValueError:
-                raise Exception(f"Invalid JSON response from XIQ API: {response.text[:200]}")
-
-            access_token = data.get("access_token")
-
-            if not access_token:
-                raise Exception(f"No access token in response. Received: {list(data.keys())}")
+            access_token = cls._parse_login_response(response.status_code, response.text)
+            if token_cache:
+                token_cache.put(username, password, base_url, access_token)
 
             if verbose:
                 print("  ✓ Authentication successful")
 
-            return cls(access_token, base_url, verify_ssl, verbose)
+            return cls(access_token, base_url, verify_ssl, verbose, session=session, **client_options)
 
         except Exception as e:
             # Re-raise our custom exceptions as-is
@@ -135,14 +253,170 @@ class XIQAPIClient:
             # Wrap unexpected exceptions
             raise Exception(f"Connection error: {str(e)}")
 
-    def _make_request(self, endpoint: str, method: str = "GET", params: dict = None) -> Optional[Dict]:
-        """Make an API request with error handling"""
+    @staticmethod
+    def _token_accepted(session: requests.Session, token: str, base_url: str, verify_ssl: bool) -> bool:
+        """Check a cached token with one cheap authenticated GET (False if XIQ rejects it)"""
+        try:
+            response = session.get(
+                f"{base_url}{XIQ_TOKEN_CHECK_ENDPOINT}",
+                headers={'Authorization': f'Bearer {token}', 'Accept': 'application/json'},
+                verify=verify_ssl,
+                timeout=DEFAULT_API_TIMEOUT
+            )
+        except requests.exceptions.RequestException:
+            return False
+        return response.ok
+
+    @staticmethod
+    def _clean_credentials(username: str, password: str) -> Tuple[str, str]:
+        """Validate and strip login credentials"""
+        # Validate inputs
+        if not username or not isinstance(username, str):
+            raise Exception("Username is required and must be a string")
+
+        if not password or not isinstance(password, str):
+            raise Exception("Password is required and must be a string")
+
+        # Clean inputs (strip whitespace)
+        username = username.strip()
+        password = password.strip()
+
+        # Basic email format validation
+        if '@' not in username or '.' not in username.split('@')[1]:
+            raise Exception("Username must be a valid email address (e.g., user@example.com)")
+
+        return username, password
+
+    @staticmethod
+    def _parse_login_response(status_code: int, text: str) -> str:
+        """Return the access token from a /login response, raising on errors"""
+        # Handle various error responses
+        if status_code == 401:
+            try:
+                error_data = loads(text)
+                error_msg = error_data.get('error_message', 'Invalid credentials')
+                raise Exception(f"Authentication failed: {error_msg}")
+            except ValueError:
+                raise Exception("Authentication failed: Invalid username or password")
+
+        if status_code >= 400:
+            try:
+                error_data = loads(text)
+                error_msg = error_data.get('error_message', error_data.get('message', text))
+                raise Exception(f"XIQ API Error: {error_msg}")
+            except ValueError:
+                raise Exception(f"XIQ API Error (HTTP {status_code}): {text[:200]}")
+
+        # Parse successful response
+        try:
+            data = loads(text)
+        except ValueError:
+            raise Exception(f"Invalid JSON response from XIQ API: {text[:200]}")
+
+        access_token = data.get("access_token")
+
+        if not access_token:
+            raise Exception(f"No access token in response. Received: {list(data.keys())}")
+
+        return access_token
+
+    @contextmanager
+    def cached_extraction(self):
+        """
+        Scope a response cache to one extraction
+
+        Inside this block, GET requests and paginated collections are keyed by
+        endpoint and params and downloaded at most once; concurrent callers
+        asking for the same key wait for the first download instead of
+        repeating it. Scopes nest - the cache is dropped when the outermost
+        block exits.
+        """
+        with self._cache_lock:
+            if self._cache_depth == 0:
+                self._response_cache = {}
+                self.incomplete_collections = set()
+            self._cache_depth += 1
+        try:
+            yield
+        finally:
+            with self._cache_lock:
+                self._cache_depth -= 1
+                if self._cache_depth == 0:
+                    self._response_cache = None
+
+    @staticmethod
+    def _cache_key(kind: str, endpoint: str, params: Optional[dict]) -> Tuple:
+        """Build a hashable cache key from endpoint and params"""
+        items = ((k, tuple(v) if isinstance(v, list) else v) for k, v in (params or {}).items())
+        return (kind, endpoint, tuple(sorted(items)))
+
+    def _cached(self, key: Tuple, fetch: Callable[[], Any]) -> Any:
+        """Return the cached result for key, calling fetch() on a miss"""
+        with self._cache_lock:
+            cache = self._response_cache
+            if cache is None:
+                entry, owner = None, False
+            elif key in cache:
+                entry, owner = cache[key], False
+            else:
+                entry, owner = Future(), True
+                cache[key] = entry
+
+        if cache is None:
+            return fetch()
+        if not owner:
+            return entry.result()
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            with self._cache_lock:
+                cache.pop(key, None)
+            entry.set_exception(e)
+            raise
+
+        # Failed requests and incomplete collections are not remembered so a later caller can retry
+        if result is None or isinstance(result, IncompleteCollection):
+            with self._cache_lock:
+                cache.pop(key, None)
+        entry.set_result(result)
+        return result
+
+    def _make_request(self, endpoint: str, method: str = "GET", params: dict = None, use_cache: bool = True) -> Optional[Dict]:
+        """Make an API request with error handling (GETs are cached inside cached_extraction())"""
+        if method == "GET" and use_cache:
+            key = self._cache_key('request', endpoint, params)
+            return self._cached(key, lambda: self._send_request(endpoint, method, params))
+        return self._send_request(endpoint, method, params)
+
+    def _send_request(self, endpoint: str, method: str = "GET", params: dict = None) -> Optional[Dict]:
+        """
+        Send an API request, returning the decoded JSON or None on error
+
+        Every call is paced by the client's RateLimitScheduler; throttled
+        responses (429/503) are retried after Retry-After up to XIQ_MAX_RETRIES times.
+        """
         url = f"{self.base_url}{endpoint}"
 
         try:
-            response = self.session.request(method, url, headers=self.headers, params=params, verify=self.verify_ssl)
+            for attempt in range(XIQ_MAX_RETRIES + 1):
+                self.scheduler.acquire()
+                started = time.perf_counter()
+                try:
+                    response = self.session.request(method, url, headers=self.headers, params=params, verify=self.verify_ssl,
+                                                    timeout=DEFAULT_API_TIMEOUT)
+                except requests.exceptions.RequestException:
+                    self.stats.record(method, endpoint, None, time.perf_counter() - started, retry=attempt > 0)
+                    raise
+                self.stats.record(method, endpoint, response.status_code, time.perf_counter() - started,
+                                  bytes_received=len(response.content), retry=attempt > 0)
+                self.scheduler.observe(response.headers)
+                if response.status_code not in (429, 503) or attempt == XIQ_MAX_RETRIES:
+                    break
+                self.scheduler.throttled(response.headers.get('Retry-After'), attempt)
+
             response.raise_for_status()
-            result = response.json()
+            result = loads(response.content)
 
             if self.verbose:
                 print(f"    DEBUG: {endpoint} returned type: {type(result)}")
@@ -152,7 +426,7 @@ class XIQAPIClient:
                     print(f"    DEBUG: List length: {len(result)}")
 
             return result
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             if self.verbose:
                 print(f"  Error fetching {endpoint}: {e}")
                 if hasattr(e, 'response') and e.response is not None:
@@ -163,112 +437,474 @@ class XIQAPIClient:
                         pass
             return None
 
-    def _make_request_with_pagination(self, endpoint: str) -> List[Dict]:
-        """Make paginated API requests and return all items"""
-        all_items = []
-        page = 1
-
-        while page <= MAX_PAGINATION_PAGES:
-            params = {"page": page, "limit": 100}
-            result = self._make_request(endpoint, params=params)
+    def _fetch_page(self, endpoint: str, page: int, params: Optional[dict] = None) -> Optional[Any]:
+        """Fetch a single page of a paginated collection"""
+        params = dict(params or {}, page=page, limit=DEFAULT_PAGE_LIMIT)
+        if self.checkpoints:
+            result = self.checkpoints.load(endpoint, params, page)
+            if result is not None:
+                return result
+
+        # Whole collections are cached by _make_request_with_pagination, not single pages
+        result = self._make_request(endpoint, params=params, use_cache=False)
+
+        # Only successful pages are checkpointed - failed ones are retried on resume
+        if result is not None and self.checkpoints:
+            self.checkpoints.save(endpoint, params, page, result)
+        return result
+
+    @staticmethod
+    def _extract_items(result: Any) -> List[Dict]:
+        """Extract the list of items from a paginated response"""
+        if isinstance(result, list):
+            # Response is already a list
+            return result
+        if isinstance(result, dict):
+            # XIQ specifically uses 'data' field
+            return result.get('data', result.get('items', result.get('results', [])))
+        return []
 
-            if not result:
-                break
+    def _make_request_with_pagination(self, endpoint: str, params: Optional[dict] = None,
+                                      stop: Optional[threading.Event] = None) -> List[Dict]:
+        """
+        Make paginated API requests and return all items
+
+        The first page is fetched on its own to learn total_pages; the remaining
+        pages are then requested in parallel (up to page_concurrency at a time)
+        and merged back in page order. Inside cached_extraction() each
+        collection is downloaded only once. Setting stop abandons the page walk
+        (pages already in flight finish); the partial result is not cached.
+        A collection cut short by a failed page is added to incomplete_collections.
+        """
+        key = self._cache_key('collection', endpoint, params)
+        items = self._cached(key, lambda: self._fetch_all_pages(endpoint, params, stop))
+        if isinstance(items, IncompleteCollection):
+            with self._cache_lock:
+                self.incomplete_collections.add(endpoint)
+        return list(items or [])
+
+    def _fetch_all_pages(self, endpoint: str, params: Optional[dict] = None,
+                         stop: Optional[threading.Event] = None) -> List[Dict]:
+        """
+        Download every page of a collection
 
-            # XIQ API uses 'data' field for paginated responses
-            items = []
-            if isinstance(result, list):
-                # Response is already a list
-                items = result
-            elif isinstance(result, dict):
-                # XIQ specifically uses 'data' field
-                items = result.get('data', result.get('items', result.get('results', [])))
+        Returns:
+            All items; an IncompleteCollection if a later page failed; None if the
+            first page failed or stop was set (the endpoint gave no usable answer)
+        """
+        def fetch(page: int) -> Optional[Any]:
+            if stop is not None and stop.is_set():
+                return None
+            return self._fetch_page(endpoint, page, params)
 
-            if not items:
-                break
+        first_page = fetch(1)
+        if first_page is None:
+            return None
+        if not first_page:
+            return []
 
-            all_items.extend(items)
+        all_items = list(self._extract_items(first_page))
+        if not all_items:
+            return []
 
-            # Check pagination info
-            if isinstance(result, dict):
-                total_pages = result.get('total_pages', result.get('totalPages', 1))
-                if page >= total_pages:
-                    break
-            else:
-                # If response is a list, we got everything
-                break
+        # If response is a list, we got everything
+        total_pages = 1
+        if isinstance(first_page, dict):
+            total_pages = first_page.get('total_pages', first_page.get('totalPages', 1)) or 1
 
-            page += 1
+        last_page = min(total_pages, MAX_PAGINATION_PAGES)
+        pages_fetched = 1
+        complete = True
 
-        if page > MAX_PAGINATION_PAGES and self.verbose:
+        if last_page > 1:
+            remaining_pages = range(2, last_page + 1)
+            executor = ThreadPoolExecutor(max_workers=min(self.page_concurrency, len(remaining_pages)))
+            try:
+                # map() yields in submission order, so items stay in page order
+                for page, result in zip(remaining_pages, executor.map(fetch, remaining_pages)):
+                    if result is None:
+                        if stop is not None and stop.is_set():
+                            return None
+                        # Always shown - continuing silently would migrate a partial collection
+                        print(f"    WARNING: Page {page} of {endpoint} failed after all retries - collection is incomplete")
+                        complete = False
+                        break
+                    items = self._extract_items(result)
+                    if not items:
+                        break
+                    all_items.extend(items)
+                    pages_fetched += 1
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        if total_pages > MAX_PAGINATION_PAGES and self.verbose:
             print(f"    WARNING: Reached maximum page limit ({MAX_PAGINATION_PAGES}), may not have retrieved all items")
 
         if self.verbose and all_items:
-            print(f"    Retrieved {len(all_items)} total items from {page - 1} pages")
+            print(f"    Retrieved {len(all_items)} total items from {pages_fetched} pages")
+
+        return all_items if complete else IncompleteCollection(all_items)
+
+    def iter_pages(self, endpoint: str, params: Optional[dict] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the raw items of a paginated collection as each page arrives
+
+        Unlike _make_request_with_pagination the collection is never held in
+        memory as a whole: at most page_concurrency pages are fetched ahead of
+        the consumer, and items are yielded in page order.
+
+        Args:
+            endpoint: Collection endpoint (e.g. /devices)
+            params: Extra query parameters sent with every page
 
-        return all_items
+        Yields:
+            Raw XIQ objects
+        """
+        first_page = self._fetch_page(endpoint, 1, params)
+        items = self._extract_items(first_page) if first_page else []
+        if not items:
+            return
+        yield from items
+
+        total_pages = 1
+        if isinstance(first_page, dict):
+            total_pages = first_page.get('total_pages', first_page.get('totalPages', 1)) or 1
+        last_page = min(total_pages, MAX_PAGINATION_PAGES)
+        if last_page <= 1:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self.page_concurrency)
+        pending = deque()
+        next_page = 2
+        try:
+            while next_page <= last_page or pending:
+                # Keep a bounded window of pages in flight ahead of the consumer
+                while next_page <= last_page and len(pending) < self.page_concurrency:
+                    pending.append(executor.submit(self._fetch_page, endpoint, next_page, params))
+                    next_page += 1
+
+                result = pending.popleft().result()
+                if result is None:
+                    print(f"    WARNING: A page of {endpoint} failed after all retries - collection is incomplete")
+                    break
+                items = self._extract_items(result)
+                if not items:
+                    break
+                yield from items
+        finally:
+            # The consumer may stop early - drop pages that were not started
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+        if total_pages > MAX_PAGINATION_PAGES and self.verbose:
+            print(f"    WARNING: Reached maximum page limit ({MAX_PAGINATION_PAGES}), may not have retrieved all items")
 
-    def get_configuration(self, network_policy_id: Optional[int] = None) -> Dict[str, Any]:
+    def iter_ssids(self, user_profiles: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield normalized SSIDs as each page arrives
+
+        Args:
+            user_profiles: Optional user profiles used to add VLAN ID and user
+                           profile name to each SSID (as get_configuration does)
+
+        Yields:
+            Normalized SSID configurations
+        """
+        user_profile_map = self._user_profile_map(user_profiles or [])
+        for ssid in self.iter_pages("/ssids"):
+            normalized = self._normalize_ssid(ssid)
+            if user_profile_map:
+                self._link_ssid_to_user_profile(normalized, user_profile_map)
+            yield self._finalize('ssid', normalized)
+
+    def iter_devices(self, server_filter: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Yield normalized Access Points as each page of /devices arrives
+
+        Args:
+            server_filter: Ask XIQ for APs only with a minimal field projection
+                           (XIQ_DEVICE_QUERY), falling back to a full fetch
+
+        Yields:
+            Normalized device configurations (APs only)
+        """
+        received = False
+        if server_filter and XIQ_DEVICE_QUERY:
+            for device in self.iter_pages("/devices", XIQ_DEVICE_QUERY):
+                received = True
+                if self._is_access_point(device):
+                    yield self._finalize('device', self._normalize_device(device))
+
+        if not received:
+            for device in self.iter_pages("/devices"):
+                if self._is_access_point(device):
+                    yield self._finalize('device', self._normalize_device(device))
+
+    def _fetch_collections(self, fetchers: Dict[str, Callable[[], List[Dict[str, Any]]]], parallel: bool) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run independent collection fetchers and join their results
+
+        Args:
+            fetchers: Mapping of result key to a zero-argument fetch method
+            parallel: Run all fetchers at the same time on a thread pool
+
+        Returns:
+            Mapping of result key to fetched collection
+        """
+        if not parallel:
+            return {key: fetch() for key, fetch in fetchers.items()}
+
+        with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+            futures = {key: executor.submit(fetch) for key, fetch in fetchers.items()}
+            return {key: future.result() for key, future in futures.items()}
+
+    def get_configuration(self, network_policy_id: Optional[int] = None, include_devices: bool = False,
+                          parallel: bool = XIQ_PARALLEL_COLLECTIONS) -> Dict[str, Any]:
         """
         Get wireless configuration from XIQ
 
         Args:
-            network_policy_id: Optional network policy ID to filter by
+            network_policy_id: Only fetch the SSIDs, user profiles and RADIUS servers this
+                               network policy uses (following references transitively)
+            include_devices: Also fetch devices (APs) and return them under 'devices'
+            parallel: Fetch all collections at the same time instead of one after another
 
         Returns:
             Dictionary containing extracted configuration
+
+        Raises:
+            IncompleteExtractionError: If pages of a collection failed after all retries
         """
         if self.verbose:
             print("Retrieving configuration from Extreme Cloud IQ...")
 
-        # Get all configuration objects
-        network_policies = self.get_network_policies()
-        user_profiles = self.get_user_profiles()
-        all_vlans = self.get_vlans()
-        all_ssids = self.get_ssids()
+        with self.cached_extraction():
+            if network_policy_id is not None:
+                config = self._get_policy_configuration(network_policy_id, include_devices, parallel)
+            else:
+                config = self._get_configuration(include_devices, parallel)
+            self.raise_if_incomplete()
+        if self.checkpoints:
+            # Every page arrived - a later run must fetch fresh data, not resume this one
+            self.checkpoints.mark_complete()
+        return config
 
-        # Create lookup tables
-        user_profile_map = {p['id']: p for p in user_profiles if isinstance(p, dict)}
-        vlan_map = {v['user_profile_id']: v for v in all_vlans if isinstance(v, dict)}
+    def raise_if_incomplete(self):
+        """Raise IncompleteExtractionError if a collection of the current extraction was cut short"""
+        with self._cache_lock:
+            incomplete = sorted(self.incomplete_collections)
+        if incomplete:
+            raise IncompleteExtractionError(incomplete)
 
-        # Link SSIDs to VLANs via user profiles
-        for ssid in all_ssids:
-            user_profile_id = ssid.get('default_user_profile')
+    def get_lazy_configuration(self, include_devices: bool = True) -> XIQConfig:
+        """
+        Get a configuration whose collections are fetched on first access
 
-            if user_profile_id and user_profile_id in user_profile_map:
-                user_profile = user_profile_map[user_profile_id]
-                vlan_profile = user_profile.get('vlan_profile', {})
-                vlan_id = vlan_profile.get('default_vlan_id')
+        Nothing is requested until a collection is read, so callers that only
+        need e.g. the SSIDs don't pay for devices or RADIUS servers.
 
-                # Add VLAN ID to SSID
-                if vlan_id:
-                    ssid['vlan_id'] = vlan_id
+        Args:
+            include_devices: Expose a 'devices' collection
+
+        Returns:
+            XIQConfig supporting the same dict-style access as get_configuration()
+        """
+        return XIQConfig(self, include_devices=include_devices)
+
+    def get_configuration_diff(self, previous: Dict[str, Any], include_devices: Optional[bool] = None,
+                               parallel: bool = XIQ_PARALLEL_COLLECTIONS,
+                               network_policy_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get a fresh configuration and diff it against a previous snapshot
+
+        This is a full extraction - XIQ list endpoints expose no modified-since
+        filter - followed by matching objects by id and comparing them by
+        content hash to report what changed since the snapshot was taken.
+
+        Args:
+            previous: Earlier configuration (e.g. loaded from --export-json output)
+            include_devices: Fetch devices; defaults to whether the snapshot has them
+            parallel: Fetch all collections at the same time instead of one after another
+            network_policy_id: Only fetch (and compare) this network policy's objects;
+                               snapshot objects outside the policy are not reported as removed
+
+        Returns:
+            Fresh configuration with a 'snapshot_diff' entry: collection name ->
+            {'added': [...], 'changed': [...], 'removed': [...], 'unchanged': int}
+        """
+        if include_devices is None:
+            include_devices = 'devices' in previous
+
+        config = self.get_configuration(network_policy_id, include_devices=include_devices, parallel=parallel)
+        config['snapshot_diff'] = diff_configurations(previous, config, scoped=network_policy_id is not None)
+        return config
+
+    def _get_configuration(self, include_devices: bool, parallel: bool) -> Dict[str, Any]:
+        """Fetch and link all collections (runs inside cached_extraction())"""
+        # Get all configuration objects - none depends on another's result
+        fetchers = {
+            'network_policies': self.get_network_policies,
+            'user_profiles': self.get_user_profiles,
+            'vlans': self.get_vlans,
+            'ssids': self.get_ssids,
+            'radio_profiles': self.get_radio_profiles,
+            'authentication': self.get_radius_servers
+        }
+        if include_devices:
+            fetchers['devices'] = self.get_devices
+
+        collections = self._fetch_collections(fetchers, parallel)
+
+        config = self._assemble_configuration(collections)
+
+        if self.verbose:
+            self._print_configuration_summary(config)
 
-                # Add user profile name for reference
-                ssid['user_profile_name'] = user_profile.get('name')
+        return config
+
+    def _get_policy_configuration(self, network_policy_id: int, include_devices: bool, parallel: bool) -> Dict[str, Any]:
+        """
+        Fetch only the objects one network policy uses (runs inside cached_extraction())
+
+        The policy's SSIDs come from /network-policies/{id}/ssids; the user
+        profiles, RADIUS client objects and RADIUS servers they reference are
+        then fetched by id, level by level, instead of listing the whole tenant.
+        """
+        policy = self._make_request(f"/network-policies/{network_policy_id}")
+        if not policy:
+            raise Exception(f"Network policy {network_policy_id} not found in XIQ")
+
+        fetchers = {
+            'policy_objects': lambda: self._get_policy_objects(network_policy_id),
+            'radio_profiles': self.get_radio_profiles
+        }
+        if include_devices:
+            fetchers['devices'] = lambda: self.get_devices(network_policy_id=network_policy_id)
+
+        collections = self._fetch_collections(fetchers, parallel)
+        collections.update(collections.pop('policy_objects'))
+        collections['network_policies'] = [policy]
+
+        config = self._assemble_configuration(collections)
+
+        if self.verbose:
+            print(f"\n  Scoped to network policy {policy.get('name', network_policy_id)} ({network_policy_id})")
+            self._print_configuration_summary(config)
+
+        return config
+
+    def _get_policy_objects(self, network_policy_id: int) -> Dict[str, List[Any]]:
+        """Fetch a policy's SSIDs and follow their references to user profiles and RADIUS servers"""
+        if self.verbose:
+            print(f"  Fetching SSIDs of network policy {network_policy_id}...")
+        raw_ssids = self._make_request_with_pagination(f"/network-policies/{network_policy_id}/ssids")
+
+        user_profiles = self._fetch_objects("/user-profiles", self._referenced_ids(raw_ssids, USER_PROFILE_REFERENCE_KEYS))
+        radius_clients = self._fetch_objects("/radius-client-objects",
+                                             self._referenced_ids(raw_ssids + user_profiles, RADIUS_CLIENT_REFERENCE_KEYS))
+        raw_servers = self._fetch_objects("/radius-servers/external",
+                                          self._referenced_ids(radius_clients, RADIUS_SERVER_REFERENCE_KEYS))
+
+        ssids = [self._finalize('ssid', self._normalize_ssid(ssid)) for ssid in raw_ssids]
+        if raw_servers:
+            servers = [self._finalize('radius_server', self._normalize_radius_server(server)) for server in raw_servers]
+        elif any(ssid['security']['type'] == 'dot1x' for ssid in ssids):
+            # 802.1X SSIDs whose RADIUS references could not be resolved - fall back to the full list
+            if self.verbose:
+                print("    ⚠ Could not resolve RADIUS references of 802.1X SSIDs, fetching all RADIUS servers...")
+            servers = self.get_radius_servers()
+        else:
+            servers = []
+
+        if self.verbose:
+            print(f"    ✓ {len(ssids)} SSIDs, {len(user_profiles)} user profiles, {len(servers)} RADIUS servers in policy")
+
+        return {
+            'ssids': ssids,
+            'user_profiles': user_profiles,
+            'vlans': [self._finalize('vlan', vlan) for vlan in self._extract_vlans(user_profiles)],
+            'authentication': servers
+        }
+
+    def _fetch_objects(self, endpoint: str, object_ids: List[Any]) -> List[Dict[str, Any]]:
+        """Fetch objects by id (GET <endpoint>/<id>) in parallel, skipping ones that fail"""
+        if not object_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.page_concurrency, len(object_ids))) as executor:
+            results = executor.map(lambda object_id: self._make_request(f"{endpoint}/{object_id}"), object_ids)
+            return [result for result in results if isinstance(result, dict)]
+
+    @staticmethod
+    def _referenced_ids(objects: List[Dict[str, Any]], keys: Tuple[str, ...]) -> List[Any]:
+        """Collect the ids referenced under any of keys, at any depth, in first-seen order"""
+        found = {}
+
+        def add(value):
+            if isinstance(value, dict):
+                value = value.get('id')
+            if isinstance(value, (int, str)) and value != '':
+                found.setdefault(value, None)
+
+        def walk(node):
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    if key in keys:
+                        for item in (value if isinstance(value, list) else [value]):
+                            add(item)
+                    if isinstance(value, (dict, list)):
+                        walk(value)
+            elif isinstance(node, list):
+                for item in node:
+                    walk(item)
+
+        walk(objects)
+        return list(found)
+
+    @staticmethod
+    def _filter_policy_devices(devices: List[Any], network_policy_id: int) -> List[Any]:
+        """Keep raw devices assigned to the policy (all devices if the listing has no policy field)"""
+        if not any(device.get('network_policy_id') is not None for device in devices):
+            return devices
+        return [device for device in devices if str(device.get('network_policy_id')) == str(network_policy_id)]
+
+    @staticmethod
+    def _assemble_configuration(collections: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Link SSIDs to user profiles and build the configuration dictionary"""
+        user_profiles = collections['user_profiles']
+        all_ssids = collections['ssids']
+
+        # Link SSIDs to VLANs via user profiles
+        XIQAPIClient._link_ssids_to_user_profiles(all_ssids, user_profiles)
 
         config = {
             'ssids': all_ssids,
-            'vlans': all_vlans,
-            'radio_profiles': self.get_radio_profiles(),
-            'network_policies': network_policies,
-            'authentication': self.get_radius_servers(),
+            'vlans': collections['vlans'],
+            'radio_profiles': collections['radio_profiles'],
+            'network_policies': collections['network_policies'],
+            'authentication': collections['authentication'],
             'qos_profiles': [],
             'captive_portals': [],
             'user_profiles': user_profiles
         }
-
-        if self.verbose:
-            print(f"\n✓ Configuration retrieved from XIQ")
-            print(f"  - SSIDs: {len(all_ssids)}")
-            print(f"  - VLANs: {len(all_vlans)}")
-            print(f"  - User Profiles: {len(user_profiles)}")
-            print(f"  - Network Policies: {len(network_policies)}")
-            print(f"  - RADIUS Servers: {len(config['authentication'])}")
-            print(f"  - Radio Profiles: {len(config['radio_profiles'])}")
+        if 'devices' in collections:
+            config['devices'] = collections['devices']
 
         return config
 
+    @staticmethod
+    def _print_configuration_summary(config: Dict[str, Any]):
+        """Print object counts for a retrieved configuration"""
+        print(f"\n✓ Configuration retrieved from XIQ")
+        print(f"  - SSIDs: {len(config['ssids'])}")
+        print(f"  - VLANs: {len(config['vlans'])}")
+        print(f"  - User Profiles: {len(config['user_profiles'])}")
+        print(f"  - Network Policies: {len(config['network_policies'])}")
+        print(f"  - RADIUS Servers: {len(config['authentication'])}")
+        print(f"  - Radio Profiles: {len(config['radio_profiles'])}")
+        if 'devices' in config:
+            print(f"  - Devices (APs): {len(config['devices'])}")
+
     def get_network_policies(self) -> List[Dict[str, Any]]:
         """Get network policies from XIQ"""
         if self.verbose:
@@ -303,27 +939,7 @@ class XIQAPIClient:
                 print(f"    ✓ Retrieved {len(ssids)} SSIDs")
 
             # Normalize SSID data to common format
-            normalized_ssids = []
-            for ssid in ssids:
-                normalized_ssids.append({
-                    'id': ssid.get('id'),  # Add the SSID ID from XIQ
-                    'name': ssid.get('ssid_name', ssid.get('name', '')),
-                    'enabled': ssid.get('enabled_status') == 'ENABLE' if 'enabled_status' in ssid else ssid.get('enabled', True),
-                    'broadcast_ssid': ssid.get('broadcast_ssid', True),
-                    'vlan_id': ssid.get('access_vlan', ssid.get('vlan_id')),
-                    'default_user_profile': ssid.get('default_user_profile'),  # XIQ user profile ID reference
-                    'security': self._normalize_security(ssid),
-                    'max_clients': ssid.get('user_limit', 0),
-                    'band_steering': ssid.get('band_steering_mode') == 'ENABLED' if 'band_steering_mode' in ssid else False,
-                    'fast_roaming': ssid.get('fast_roaming_802_11r') == 'ENABLED' if 'fast_roaming_802_11r' in ssid else False,
-                    'radio_profile': ssid.get('radio_profile_id'),
-                    'qos_profile': ssid.get('qos_profile_id'),
-                    'captive_portal': ssid.get('captive_web_portal_id'),
-                    'policy_id': ssid.get('network_policy_id'),
-                    'original': ssid
-                })
-
-            return normalized_ssids
+            return [self._finalize('ssid', self._normalize_ssid(ssid)) for ssid in ssids]
         else:
             if self.verbose:
                 print(f"    ⚠ No SSIDs found")
@@ -332,7 +948,8 @@ class XIQAPIClient:
     def get_vlans(self) -> List[Dict[str, Any]]:
         """
         Get all VLANs from XIQ
-        In XIQ, VLANs are embedded in user profiles under vlan_profile
+        In XIQ, VLANs are embedded in user profiles under vlan_profile, so inside
+        cached_extraction() this reuses the /user-profiles download
 
         Returns:
             List of VLAN configurations
@@ -349,46 +966,7 @@ class XIQAPIClient:
             return []
 
         # Extract unique VLANs from user profiles
-        vlans_dict = {}
-        for profile in user_profiles:
-            vlan_profile = profile.get('vlan_profile', {})
-            vlan_id = vlan_profile.get('default_vlan_id')
-
-            if vlan_id and vlan_id not in vlans_dict:
-                vlans_dict[vlan_id] = {
-                    # Core VLAN identifiers
-                    'vlan_id': vlan_id,
-                    'name': vlan_profile.get('name', f'VLAN_{vlan_id}'),
-                    'description': f"VLAN from user profile: {profile.get('name', '')}",
-
-                    # XIQ-specific fields
-                    'vlan_profile_id': vlan_profile.get('id'),
-                    'user_profile_name': profile.get('name'),
-                    'user_profile_id': profile.get('id'),
-
-                    # Classification
-                    'enable_classification': vlan_profile.get('enable_classification', False),
-                    'classification_rules': vlan_profile.get('classified_entries', []),
-
-                    # Defaults (XIQ doesn't store full VLAN config in user profiles)
-                    'subnet': None,
-                    'gateway': None,
-                    'netmask': None,
-                    'dhcp_enabled': False,
-                    'dhcp_start': None,
-                    'dhcp_end': None,
-                    'dhcp_lease_time': None,
-                    'dhcp_dns_servers': [],
-                    'group': 0,
-                    'tagged': False,
-                    'mtu': 1500,
-                    'enabled': True,
-
-                    # Metadata
-                    'original': vlan_profile
-                }
-
-        normalized_vlans = list(vlans_dict.values())
+        normalized_vlans = [self._finalize('vlan', vlan) for vlan in self._extract_vlans(user_profiles)]
 
         if self.verbose:
             print(f"    ✓ Extracted {len(normalized_vlans)} unique VLANs from user profiles")
@@ -407,103 +985,105 @@ class XIQAPIClient:
                 print(f"    ✓ Retrieved {len(profiles)} radio profiles")
 
             # Normalize radio profile data
-            normalized_profiles = []
-            for profile in profiles:
-                normalized_profiles.append({
-                    'name': profile.get('name', ''),
-                    'band': profile.get('radio_band', profile.get('band', '2.4GHz')),
-                    'channel': profile.get('channel', 'auto'),
-                    'channel_width': profile.get('channel_width', profile.get('bandwidth', '20MHz')),
-                    'tx_power': profile.get('tx_power', profile.get('power', 'auto')),
-                    'min_rssi': profile.get('min_rssi', None),
-                    'max_clients': profile.get('max_clients', 0),
-                    'original': profile
-                })
-
-            return normalized_profiles
+            return [self._finalize('radio_profile', self._normalize_radio_profile(profile)) for profile in profiles]
         else:
             if self.verbose:
                 print("    ⚠ No radio profiles found")
             return []
 
     def get_radius_servers(self) -> List[Dict[str, Any]]:
-        """Get RADIUS server configurations from XIQ"""
+        """
+        Get RADIUS server configurations from XIQ
+
+        Tenants expose RADIUS servers under different endpoints. The endpoint
+        remembered for this tenant is tried first; otherwise all of
+        XIQ_RADIUS_ENDPOINTS are probed at the same time and the first
+        non-empty result (in order of preference) is used and remembered.
+        """
         if self.verbose:
             print("  Fetching RADIUS servers...")
 
-        # Try external RADIUS servers endpoint first
-        servers = self._make_request_with_pagination("/radius-servers/external")
-
-        # Also try alternative endpoints if no results
-        if not servers:
-            if self.verbose:
-                print("    ⚠ No servers at /radius-servers/external, trying /radius-servers...")
-            servers = self._make_request_with_pagination("/radius-servers")
+        servers = []
+        remembered = self.endpoint_cache.get(self.tenant, 'radius_servers') if self.endpoint_cache else None
+        if remembered:
+            servers = self._make_request_with_pagination(remembered)
+            if not servers and self.verbose:
+                print(f"    ⚠ No servers at remembered endpoint {remembered}, probing all endpoints...")
 
         if not servers:
-            if self.verbose:
-                print("    ⚠ No servers at /radius-servers, trying /aaa-servers...")
-            servers = self._make_request_with_pagination("/aaa-servers")
+            servers = self._probe_radius_endpoints()
 
         if servers:
             if self.verbose:
                 print(f"    ✓ Retrieved {len(servers)} RADIUS servers")
 
             # Normalize RADIUS server data
-            normalized_servers = []
-            for server in servers:
-                normalized_servers.append({
-                    'name': server.get('name', server.get('server_name', '')),
-                    'ip': server.get('ip_address', server.get('ip', '')),
-                    'auth_port': server.get('auth_port', server.get('authentication_port', 1812)),
-                    'acct_port': server.get('acct_port', server.get('accounting_port', 1813)),
-                    'secret': server.get('shared_secret', server.get('secret', '')),
-                    'timeout': server.get('timeout', 5),
-                    'retries': server.get('retries', 3),
-                    'enabled': server.get('enabled', True),
-                    'original': server
-                })
-
-            return normalized_servers
+            return [self._finalize('radius_server', self._normalize_radius_server(server)) for server in servers]
         else:
             if self.verbose:
                 print("    ⚠ No RADIUS servers found")
             return []
 
-    def get_devices(self) -> List[Dict[str, Any]]:
+    def _probe_radius_endpoints(self) -> List[Dict[str, Any]]:
+        """Query every RADIUS endpoint concurrently and return the preferred non-empty result"""
+        executor = ThreadPoolExecutor(max_workers=len(XIQ_RADIUS_ENDPOINTS))
+        stop = threading.Event()
+        try:
+            futures = [(endpoint, executor.submit(self._make_request_with_pagination, endpoint, None, stop))
+                       for endpoint in XIQ_RADIUS_ENDPOINTS]
+            for endpoint, future in futures:
+                servers = future.result()
+                if servers:
+                    if self.verbose:
+                        print(f"    ✓ RADIUS servers found at {endpoint}")
+                    if self.endpoint_cache:
+                        self.endpoint_cache.set(self.tenant, 'radius_servers', endpoint)
+                    return servers
+                if self.verbose:
+                    print(f"    ⚠ No servers at {endpoint}")
+            return []
+        finally:
+            # Less preferred probes stop paginating once an answer is found (without waiting for them)
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_devices(self, server_filter: bool = True, network_policy_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get all devices (APs) from XIQ
 
+        Args:
+            server_filter: Ask XIQ for APs only with a minimal field projection
+                           (XIQ_DEVICE_QUERY). If the filtered request fails or
+                           returns nothing, all devices are fetched and filtered here.
+            network_policy_id: Only keep APs assigned to this network policy (ignored
+                               if the device listing doesn't include the policy id)
+
         Returns:
             List of device configurations with names and locations
         """
         if self.verbose:
             print("  Fetching devices...")
 
-        devices = self._make_request_with_pagination("/devices")
+        devices = []
+        if server_filter and XIQ_DEVICE_QUERY:
+            devices = self._make_request_with_pagination("/devices", params=XIQ_DEVICE_QUERY)
+            if not devices and self.verbose:
+                print("    ⚠ Server-side AP filter returned nothing, fetching all devices...")
+
+        if not devices:
+            devices = self._make_request_with_pagination("/devices")
 
         if devices:
-            # Filter for Access Points only
-            aps = [d for d in devices if d.get('device_function') == 'AP' or d.get('product_type', '').startswith('AP')]
+            # Filter for Access Points only (also covers servers that ignore the AP filter)
+            aps = [d for d in devices if self._is_access_point(d)]
+            if network_policy_id is not None:
+                aps = self._filter_policy_devices(aps, network_policy_id)
 
             if self.verbose:
                 print(f"    ✓ Retrieved {len(aps)} Access Points (out of {len(devices)} total devices)")
 
             # Normalize device data
-            normalized_devices = []
-            for device in aps:
-                normalized_devices.append({
-                    'serial_number': device.get('serial_number'),
-                    'name': device.get('hostname', device.get('device_name', device.get('serial_number'))),
-                    'location': device.get('location', ''),
-                    'model': device.get('product_type', device.get('model', '')),
-                    'mac_address': device.get('mac_address', device.get('mac', '')),
-                    'connected': device.get('connected', False),
-                    'ip_address': device.get('ip_address', ''),
-                    'original': device
-                })
-
-            return normalized_devices
+            return [self._finalize('device', self._normalize_device(device)) for device in aps]
         else:
             if self.verbose:
                 print("    ⚠ No devices found")
@@ -525,7 +1105,158 @@ class XIQAPIClient:
                 print("    ⚠ No user profiles found")
             return []
 
-    def _normalize_security(self, ssid: Dict[str, Any]) -> Dict[str, Any]:
+    def _finalize(self, kind: str, record: Dict[str, Any]) -> Any:
+        """Return a normalized record as-is, or as a compact slotted record in compact mode"""
+        if not self.compact:
+            return record
+        return compact_record(kind, record, self.raw_store)
+
+    # ---- Normalization helpers (shared with AsyncXIQAPIClient) ----
+
+    @staticmethod
+    def _link_ssids_to_user_profiles(ssids: List[Dict[str, Any]], user_profiles: List[Dict[str, Any]]):
+        """Add VLAN ID and user profile name to each SSID from its default user profile"""
+        user_profile_map = XIQAPIClient._user_profile_map(user_profiles)
+        for ssid in ssids:
+            XIQAPIClient._link_ssid_to_user_profile(ssid, user_profile_map)
+
+    @staticmethod
+    def _user_profile_map(user_profiles: List[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        """Build the user profile lookup table used to link SSIDs"""
+        return {p['id']: p for p in user_profiles if isinstance(p, dict)}
+
+    @staticmethod
+    def _link_ssid_to_user_profile(ssid: Dict[str, Any], user_profile_map: Dict[Any, Dict[str, Any]]):
+        """Add VLAN ID and user profile name to one SSID from its default user profile"""
+        user_profile_id = ssid.get('default_user_profile')
+
+        if user_profile_id and user_profile_id in user_profile_map:
+            user_profile = user_profile_map[user_profile_id]
+            vlan_profile = user_profile.get('vlan_profile', {})
+            vlan_id = vlan_profile.get('default_vlan_id')
+
+            # Add VLAN ID to SSID
+            if vlan_id:
+                ssid['vlan_id'] = vlan_id
+
+            # Add user profile name for reference
+            ssid['user_profile_name'] = user_profile.get('name')
+
+    @staticmethod
+    def _extract_vlans(user_profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Extract unique VLANs from the vlan_profile of each user profile"""
+        vlans_dict = {}
+        for profile in user_profiles:
+            vlan_profile = profile.get('vlan_profile', {})
+            vlan_id = vlan_profile.get('default_vlan_id')
+
+            if vlan_id and vlan_id not in vlans_dict:
+                vlans_dict[vlan_id] = {
+                    # Core VLAN identifiers
+                    'vlan_id': vlan_id,
+                    'name': vlan_profile.get('name', f'VLAN_{vlan_id}'),
+                    'description': f"VLAN from user profile: {profile.get('name', '')}",
+
+                    # XIQ-specific fields
+                    'vlan_profile_id': vlan_profile.get('id'),
+                    'user_profile_name': profile.get('name'),
+                    'user_profile_id': profile.get('id'),
+
+                    # Classification
+                    'enable_classification': vlan_profile.get('enable_classification', False),
+                    'classification_rules': vlan_profile.get('classified_entries', []),
+
+                    # Defaults (XIQ doesn't store full VLAN config in user profiles)
+                    'subnet': None,
+                    'gateway': None,
+                    'netmask': None,
+                    'dhcp_enabled': False,
+                    'dhcp_start': None,
+                    'dhcp_end': None,
+                    'dhcp_lease_time': None,
+                    'dhcp_dns_servers': [],
+                    'group': 0,
+                    'tagged': False,
+                    'mtu': 1500,
+                    'enabled': True,
+
+                    # Metadata
+                    'original': vlan_profile
+                }
+
+        return list(vlans_dict.values())
+
+    @staticmethod
+    def _normalize_ssid(ssid: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a raw XIQ SSID to the common format"""
+        return {
+            'id': ssid.get('id'),  # Add the SSID ID from XIQ
+            'name': ssid.get('ssid_name', ssid.get('name', '')),
+            'enabled': ssid.get('enabled_status') == 'ENABLE' if 'enabled_status' in ssid else ssid.get('enabled', True),
+            'broadcast_ssid': ssid.get('broadcast_ssid', True),
+            'vlan_id': ssid.get('access_vlan', ssid.get('vlan_id')),
+            'default_user_profile': ssid.get('default_user_profile'),  # XIQ user profile ID reference
+            'security': XIQAPIClient._normalize_security(ssid),
+            'max_clients': ssid.get('user_limit', 0),
+            'band_steering': ssid.get('band_steering_mode') == 'ENABLED' if 'band_steering_mode' in ssid else False,
+            'fast_roaming': ssid.get('fast_roaming_802_11r') == 'ENABLED' if 'fast_roaming_802_11r' in ssid else False,
+            'radio_profile': ssid.get('radio_profile_id'),
+            'qos_profile': ssid.get('qos_profile_id'),
+            'captive_portal': ssid.get('captive_web_portal_id'),
+            'policy_id': ssid.get('network_policy_id'),
+            'original': ssid
+        }
+
+    @staticmethod
+    def _normalize_radio_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a raw XIQ radio profile to the common format"""
+        return {
+            'name': profile.get('name', ''),
+            'band': profile.get('radio_band', profile.get('band', '2.4GHz')),
+            'channel': profile.get('channel', 'auto'),
+            'channel_width': profile.get('channel_width', profile.get('bandwidth', '20MHz')),
+            'tx_power': profile.get('tx_power', profile.get('power', 'auto')),
+            'min_rssi': profile.get('min_rssi', None),
+            'max_clients': profile.get('max_clients', 0),
+            'original': profile
+        }
+
+    @staticmethod
+    def _normalize_radius_server(server: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a raw XIQ RADIUS server to the common format"""
+        return {
+            'name': server.get('name', server.get('server_name', '')),
+            'ip': server.get('ip_address', server.get('ip', '')),
+            'auth_port': server.get('auth_port', server.get('authentication_port', 1812)),
+            'acct_port': server.get('acct_port', server.get('accounting_port', 1813)),
+            'secret': server.get('shared_secret', server.get('secret', '')),
+            'timeout': server.get('timeout', 5),
+            'retries': server.get('retries', 3),
+            'enabled': server.get('enabled', True),
+            'original': server
+        }
+
+    @staticmethod
+    def _is_access_point(device: Dict[str, Any]) -> bool:
+        """Whether a raw XIQ device is an Access Point"""
+        return device.get('device_function') == 'AP' or device.get('product_type', '').startswith('AP')
+
+    @staticmethod
+    def _normalize_device(device: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a raw XIQ device to the common format"""
+        return {
+            'serial_number': device.get('serial_number'),
+            'name': device.get('hostname', device.get('device_name', device.get('serial_number'))),
+            'location': device.get('location', ''),
+            'model': device.get('product_type', device.get('model', '')),
+            'mac_address': device.get('mac_address', device.get('mac', '')),
+            'connected': device.get('connected', False),
+            'ip_address': device.get('ip_address', ''),
+            'original': device
+        }
+
+    @staticmethod
+    def _normalize_security(ssid: Dict[str, Any]) -> Dict[str, Any]:
         """Normalize XIQ SSID security settings to common format"""
         # XIQ uses 'access_security' object
         access_security = ssid.get('access_security', {})
@@ -631,8 +1362,7 @@ class XIQAPIClient:
             config: Configuration dictionary
             output_file: Path to output file
         """
-        with open(output_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        dump_file(config, output_file)
 
         if self.verbose:
             print(f"\n✓ Configuration saved to {output_file}")
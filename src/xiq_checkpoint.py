@@ -0,0 +1,159 @@
+"""
+XIQ Page Checkpoints
+Persists each completed page of a paginated XIQ collection to a run directory
+so an interrupted extraction can resume from the pages it already has
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+try:
+    from .json_codec import load_file, dumps_bytes
+except ImportError:
+    from json_codec import load_file, dumps_bytes
+
+# Import configuration constants
+try:
+    from .config import XIQ_CHECKPOINT_MAX_AGE
+except ImportError:
+    # Fallback if config.py doesn't exist
+    XIQ_CHECKPOINT_MAX_AGE = 24 * 3600
+
+MANIFEST_FILE = 'manifest.json'
+
+
+class PageCheckpointStore:
+    """
+    On-disk page store for one extraction run
+
+    Layout: <run_dir>/tenant-<hash>/<collection>/page_00001.json, where the
+    tenant directory is keyed by tenant and region (see endpoint_cache.tenant_key)
+    and <collection> is the endpoint plus a short hash of the query parameters
+    (other than page/limit). Each tenant directory holds a manifest.json naming
+    the tenant and when its run started; pages of a run older than max_age, or
+    of a run marked complete (see mark_complete), are discarded rather than
+    resumed - only an interrupted run is ever resumed. Pages are written atomically (temp file +
+    rename), so a crash never leaves a half-written page behind - a page file
+    either exists complete or not at all.
+    """
+
+    def __init__(self, run_dir: str, tenant: str, verbose: bool = False, max_age: float = XIQ_CHECKPOINT_MAX_AGE):
+        """
+        Initialize the checkpoint store
+
+        Args:
+            run_dir: Directory holding the checkpoints (created if missing)
+            tenant: Tenant key of the client (pages of other tenants are never used)
+            verbose: Enable verbose logging
+            max_age: Seconds after which a previous run's pages are stale
+        """
+        self.run_dir = run_dir
+        self.tenant = tenant
+        self.verbose = verbose
+        self.pages_loaded = 0
+        self.pages_saved = 0
+        self.tenant_dir = os.path.join(run_dir, 'tenant-' + hashlib.sha1(tenant.encode('utf-8')).hexdigest()[:12])
+        self._manifest: Dict[str, Any] = {}
+        self._open_run(max_age)
+
+    def _open_run(self, max_age: float):
+        """Check the manifest of a previous run, starting a new run if it is missing, foreign, stale or complete"""
+        manifest_path = os.path.join(self.tenant_dir, MANIFEST_FILE)
+        try:
+            manifest = load_file(manifest_path)
+        except (OSError, ValueError):
+            manifest = None
+
+        if isinstance(manifest, dict) and manifest.get('tenant') == self.tenant:
+            age = time.time() - manifest.get('created', 0)
+            if manifest.get('complete'):
+                if self.verbose:
+                    print(f"  Discarding checkpoints of the completed run from {manifest.get('created_at')}")
+            elif age <= max_age:
+                if self.verbose:
+                    print(f"  Resuming checkpoints from {manifest.get('created_at')} in {self.tenant_dir}")
+                self._manifest = manifest
+                return
+            elif self.verbose:
+                print(f"  Discarding checkpoints from {manifest.get('created_at')} (older than {max_age / 3600:g}h)")
+
+        # No usable run - start over so no page of another run is loaded as current data
+        shutil.rmtree(self.tenant_dir, ignore_errors=True)
+        os.makedirs(self.tenant_dir, exist_ok=True)
+        now = time.time()
+        self._manifest = {
+            'tenant': self.tenant,
+            'created': now,
+            'created_at': datetime.fromtimestamp(now).isoformat(timespec='seconds'),
+            'complete': False
+        }
+        self._write_atomic(manifest_path, dumps_bytes(self._manifest, pretty=True))
+
+    def mark_complete(self):
+        """Mark the run as finished so its pages are never resumed as current data"""
+        self._manifest['complete'] = True
+        self._write_atomic(os.path.join(self.tenant_dir, MANIFEST_FILE), dumps_bytes(self._manifest, pretty=True))
+
+    @staticmethod
+    def _collection_dir_name(endpoint: str, params: Optional[Dict[str, Any]]) -> str:
+        """Build a filesystem-safe directory name for an endpoint + params"""
+        slug = re.sub(r'[^A-Za-z0-9_-]+', '_', endpoint.strip('/')) or 'root'
+        query = {k: v for k, v in (params or {}).items() if k not in ('page', 'limit')}
+        if not query:
+            return slug
+        digest = hashlib.sha1(json.dumps(query, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:10]
+        return f"{slug}-{digest}"
+
+    def _page_path(self, endpoint: str, params: Optional[Dict[str, Any]], page: int) -> str:
+        return os.path.join(self.tenant_dir, self._collection_dir_name(endpoint, params), f"page_{page:05d}.json")
+
+    def load(self, endpoint: str, params: Optional[Dict[str, Any]], page: int) -> Optional[Any]:
+        """
+        Load a checkpointed page
+
+        Returns:
+            The page response as originally received, or None if not checkpointed
+        """
+        path = self._page_path(endpoint, params, page)
+        try:
+            result = load_file(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            # Treat an unreadable page as missing - it will be fetched again
+            if self.verbose:
+                print(f"    WARNING: Ignoring unreadable checkpoint {path}: {e}")
+            return None
+
+        self.pages_loaded += 1
+        if self.verbose:
+            print(f"    Resumed {endpoint} page {page} from checkpoint")
+        return result
+
+    def save(self, endpoint: str, params: Optional[Dict[str, Any]], page: int, result: Any):
+        """Atomically write a completed page"""
+        path = self._page_path(endpoint, params, page)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write_atomic(path, dumps_bytes(result))
+        self.pages_saved += 1
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.page-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,127 @@
+"""
+Lazy XIQ Configuration
+Dictionary-like view of an XIQ configuration whose collections are fetched
+from the API the first time they are accessed
+"""
+
+import threading
+from collections.abc import Mapping
+from typing import Dict, Any, Iterator, List, Optional
+
+# Import configuration constants
+try:
+    from .config import XIQ_PARALLEL_COLLECTIONS
+except ImportError:
+    # Fallback if config.py doesn't exist
+    XIQ_PARALLEL_COLLECTIONS = True
+
+# Collections in the order get_configuration() returns them
+CONFIG_COLLECTIONS = ('ssids', 'vlans', 'radio_profiles', 'network_policies', 'authentication',
+                      'qos_profiles', 'captive_portals', 'user_profiles', 'devices')
+
+
+class XIQConfig(Mapping):
+    """
+    Lazily loaded XIQ configuration
+
+    Supports the read-only dict access used by ConfigConverter.convert and
+    MigrationReportGenerator (config['ssids'], config.get('devices', []),
+    'vlans' in config). Each collection is fetched and normalized on first
+    access, then memoized; concurrent first accesses to the same collection
+    share one fetch. Collections that depend on each other reuse the memoized
+    result (VLANs are extracted from the user profiles, SSIDs are linked to
+    them), so /user-profiles is downloaded at most once.
+    """
+
+    def __init__(self, client, include_devices: bool = True):
+        """
+        Initialize the lazy configuration
+
+        Args:
+            client: Connected XIQAPIClient used to fetch collections
+            include_devices: Expose a 'devices' collection
+        """
+        self.client = client
+        self._keys = [key for key in CONFIG_COLLECTIONS if include_devices or key != 'devices']
+        self._loaders = {
+            'ssids': self._load_ssids,
+            'vlans': self._load_vlans,
+            'radio_profiles': client.get_radio_profiles,
+            'network_policies': client.get_network_policies,
+            'authentication': client.get_radius_servers,
+            'qos_profiles': list,
+            'captive_portals': list,
+            'user_profiles': client.get_user_profiles,
+            'devices': client.get_devices
+        }
+        self._data: Dict[str, List[Any]] = {}
+        self._locks = {key: threading.Lock() for key in self._keys}
+
+    def __getitem__(self, key: str) -> List[Any]:
+        if key not in self._locks:
+            raise KeyError(key)
+        if key in self._data:
+            return self._data[key]
+        with self._locks[key]:
+            if key not in self._data:
+                self._data[key] = self._loaders[key]()
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        # Membership must not trigger a fetch
+        return key in self._locks
+
+    def __repr__(self) -> str:
+        return f"XIQConfig(loaded={self.loaded})"
+
+    @property
+    def loaded(self) -> List[str]:
+        """Names of the collections fetched so far"""
+        return [key for key in self._keys if key in self._data]
+
+    def load(self, keys: Optional[List[str]] = None, parallel: bool = XIQ_PARALLEL_COLLECTIONS) -> 'XIQConfig':
+        """
+        Fetch collections ahead of access
+
+        The collections are fetched at the same time inside one cached
+        extraction, so shared requests (e.g. /user-profiles for both SSIDs
+        and VLANs) are only sent once.
+
+        Args:
+            keys: Collections to fetch (default: all)
+            parallel: Fetch the collections concurrently instead of one after another
+
+        Returns:
+            self, for chaining
+
+        Raises:
+            IncompleteExtractionError: If pages of a collection failed after all retries
+        """
+        keys = [key for key in (self._keys if keys is None else keys) if key not in self._data]
+        if any(key in ('ssids', 'vlans') for key in keys) and 'user_profiles' in self._locks and 'user_profiles' not in keys:
+            # Both are built from the user profiles - start that download alongside them
+            keys.append('user_profiles')
+        if keys:
+            with self.client.cached_extraction():
+                self.client._fetch_collections({key: (lambda key=key: self[key]) for key in keys}, parallel)
+                self.client.raise_if_incomplete()
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a plain dictionary of all collections (fetching any not loaded yet)"""
+        return {key: self[key] for key in self._keys}
+
+    def _load_vlans(self) -> List[Any]:
+        client = self.client
+        return [client._finalize('vlan', vlan) for vlan in client._extract_vlans(self['user_profiles'])]
+
+    def _load_ssids(self) -> List[Any]:
+        ssids = self.client.get_ssids()
+        self.client._link_ssids_to_user_profiles(ssids, self['user_profiles'])
+        return ssids
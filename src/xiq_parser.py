@@ -3,10 +3,14 @@ XIQ Configuration Parser
 Extracts SSIDs, VLANs, Radio Profiles, and other wireless objects from XIQ configuration
 """
 
-import json
 from typing import Dict, List, Any
 from pathlib import Path
 
+try:
+    from .json_codec import load_file
+except ImportError:
+    from json_codec import load_file
+
 
 class XIQParser:
     """Parser for Extreme Cloud IQ configuration files"""
@@ -29,8 +33,7 @@ class XIQParser:
             Dictionary containing extracted configuration objects
         """
         # Load the configuration file
-        with open(self.config_file, 'r') as f:
-            self.raw_config = json.load(f)
+        self.raw_config = load_file(self.config_file)
 
         # Extract different configuration components
         extracted_config = {
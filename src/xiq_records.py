@@ -0,0 +1,255 @@
+"""
+Compact XIQ Records
+Slotted record types used by XIQAPIClient in compact mode instead of dicts
+carrying an 'original' copy of the raw XIQ payload. Raw payloads can be
+spilled to a single on-disk side store and are loaded only when requested.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    from .json_codec import loads, dumps_bytes
+except ImportError:
+    from json_codec import loads, dumps_bytes
+
+
+class RawPayloadStore:
+    """Append-only single-file store for raw XIQ payloads, keyed by object type and id"""
+
+    def __init__(self, path: str):
+        """
+        Initialize the raw payload store
+
+        Args:
+            path: File to write raw payloads to (truncated if it exists)
+        """
+        self.path = path
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._file = open(path, 'w+b')
+
+    def put(self, kind: str, key: Any, payload: Dict[str, Any]) -> str:
+        """
+        Append a raw payload and return its reference
+
+        Args:
+            kind: Object type (ssid, vlan, device, ...)
+            key: Object id; a sequence number is used when None
+            payload: Raw XIQ object
+
+        Returns:
+            Reference string for get()
+        """
+        data = dumps_bytes(payload) + b'\n'
+        with self._lock:
+            if key is None:
+                self._sequence += 1
+                key = f'#{self._sequence}'
+            ref = f'{kind}:{key}'
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(data)
+            self._index[ref] = (offset, len(data))
+        return ref
+
+    def get(self, ref: str) -> Optional[Dict[str, Any]]:
+        """Load a raw payload by reference (None if unknown)"""
+        with self._lock:
+            location = self._index.get(ref)
+            if location is None:
+                return None
+            offset, length = location
+            self._file.flush()
+            self._file.seek(offset)
+            data = self._file.read(length)
+        return loads(data)
+
+    def close(self):
+        """Close the backing file (the file itself is kept)"""
+        with self._lock:
+            self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class _Record:
+    """
+    Dict-style access for slotted records
+
+    ConfigConverter, the exporters and the report generator read records with
+    record.get('name') / record['name'], so compact records keep that interface.
+    """
+
+    __slots__ = ()
+
+    def _public_fields(self) -> List[str]:
+        return [f.name for f in fields(self) if not f.name.startswith('_')]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == 'original':
+            return self.original
+        if key in self.__dataclass_fields__ and not key.startswith('_'):
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'original':
+            return self.original
+        if key not in self.__dataclass_fields__ or key.startswith('_'):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__dataclass_fields__ or key.startswith('_'):
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and key in self.__dataclass_fields__ and not key.startswith('_')
+
+    def keys(self) -> List[str]:
+        return self._public_fields()
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(name, getattr(self, name)) for name in self._public_fields()]
+
+    @property
+    def original(self) -> Optional[Dict[str, Any]]:
+        """Raw XIQ payload, loaded from the side store on demand"""
+        if self._store is None or self._raw_ref is None:
+            return None
+        return self._store.get(self._raw_ref)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the normalized fields (without the raw payload)"""
+        return dict(self.items())
+
+
+@dataclass(slots=True)
+class SSIDRecord(_Record):
+    id: Any = None
+    name: str = ''
+    enabled: bool = True
+    broadcast_ssid: bool = True
+    vlan_id: Any = None
+    default_user_profile: Any = None
+    security: Dict[str, Any] = field(default_factory=dict)
+    max_clients: int = 0
+    band_steering: bool = False
+    fast_roaming: bool = False
+    radio_profile: Any = None
+    qos_profile: Any = None
+    captive_portal: Any = None
+    policy_id: Any = None
+    user_profile_name: Optional[str] = None
+    _raw_ref: Optional[str] = field(default=None, repr=False, compare=False)
+    _store: Optional[RawPayloadStore] = field(default=None, repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class VLANRecord(_Record):
+    vlan_id: Any = None
+    name: str = ''
+    description: str = ''
+    vlan_profile_id: Any = None
+    user_profile_name: Optional[str] = None
+    user_profile_id: Any = None
+    enable_classification: bool = False
+    classification_rules: List[Any] = field(default_factory=list)
+    subnet: Optional[str] = None
+    gateway: Optional[str] = None
+    netmask: Optional[str] = None
+    dhcp_enabled: bool = False
+    dhcp_start: Optional[str] = None
+    dhcp_end: Optional[str] = None
+    dhcp_lease_time: Optional[int] = None
+    dhcp_dns_servers: List[str] = field(default_factory=list)
+    group: int = 0
+    tagged: bool = False
+    mtu: int = 1500
+    enabled: bool = True
+    _raw_ref: Optional[str] = field(default=None, repr=False, compare=False)
+    _store: Optional[RawPayloadStore] = field(default=None, repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class RadioProfileRecord(_Record):
+    name: str = ''
+    band: str = '2.4GHz'
+    channel: Any = 'auto'
+    channel_width: Any = '20MHz'
+    tx_power: Any = 'auto'
+    min_rssi: Any = None
+    max_clients: int = 0
+    _raw_ref: Optional[str] = field(default=None, repr=False, compare=False)
+    _store: Optional[RawPayloadStore] = field(default=None, repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class RadiusServerRecord(_Record):
+    name: str = ''
+    ip: str = ''
+    auth_port: int = 1812
+    acct_port: int = 1813
+    secret: str = ''
+    timeout: int = 5
+    retries: int = 3
+    enabled: bool = True
+    _raw_ref: Optional[str] = field(default=None, repr=False, compare=False)
+    _store: Optional[RawPayloadStore] = field(default=None, repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class DeviceRecord(_Record):
+    serial_number: Optional[str] = None
+    name: Optional[str] = None
+    location: Any = ''
+    model: str = ''
+    mac_address: str = ''
+    connected: bool = False
+    ip_address: str = ''
+    _raw_ref: Optional[str] = field(default=None, repr=False, compare=False)
+    _store: Optional[RawPayloadStore] = field(default=None, repr=False, compare=False)
+
+
+# Record type and id field (for the side store key) per object type
+RECORD_TYPES = {
+    'ssid': (SSIDRecord, 'id'),
+    'vlan': (VLANRecord, 'vlan_id'),
+    'radio_profile': (RadioProfileRecord, None),
+    'radius_server': (RadiusServerRecord, None),
+    'device': (DeviceRecord, 'serial_number')
+}
+
+
+def compact_record(kind: str, normalized: Dict[str, Any], store: Optional[RawPayloadStore] = None) -> _Record:
+    """
+    Convert a normalized record dict into its slotted record type
+
+    The 'original' payload is written to the side store if one is given,
+    otherwise it is dropped.
+
+    Args:
+        kind: Object type (key of RECORD_TYPES)
+        normalized: Normalized record as built by XIQAPIClient
+        store: Optional side store for the raw payload
+
+    Returns:
+        Slotted record
+    """
+    record_type, id_field = RECORD_TYPES[kind]
+    original = normalized.pop('original', None)
+
+    raw_ref = None
+    if store is not None and original is not None:
+        key = normalized.get(id_field) if id_field else original.get('id')
+        raw_ref = store.put(kind, key, original)
+
+    known = record_type.__dataclass_fields__
+    values = {k: v for k, v in normalized.items() if k in known and not k.startswith('_')}
+    return record_type(**values, _raw_ref=raw_ref, _store=store)
@@ -0,0 +1,137 @@
+"""
+XIQ Snapshot Diff
+Compares a fresh XIQ extraction against a previous snapshot (the --export-json
+output) and reports which objects were added, changed or removed. This is a
+report only - the fresh extraction is still a full download.
+"""
+
+import hashlib
+import json
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    from .json_codec import load_file
+except ImportError:
+    from json_codec import load_file
+
+# Collection name -> fields tried in order to identify an object across snapshots
+DIFF_COLLECTIONS: Dict[str, Tuple[str, ...]] = {
+    'ssids': ('id', 'name'),
+    'vlans': ('vlan_id',),
+    'radio_profiles': ('id', 'name'),
+    'authentication': ('id', 'name'),
+    'network_policies': ('id', 'name'),
+    'user_profiles': ('id', 'name'),
+    'devices': ('serial_number', 'id'),
+}
+
+
+def load_snapshot(path: str) -> Dict[str, Any]:
+    """
+    Load a previous XIQ snapshot
+
+    Args:
+        path: JSON file written by --export-json
+
+    Returns:
+        Snapshot dictionary
+    """
+    snapshot = load_file(path)
+    if not isinstance(snapshot, dict):
+        raise ValueError(f"{path} is not an XIQ configuration snapshot")
+    return snapshot
+
+
+def _as_dict(record: Any) -> Dict[str, Any]:
+    return record.to_dict() if hasattr(record, 'to_dict') else dict(record)
+
+
+def record_key(record: Any, key_fields: Tuple[str, ...]) -> Optional[str]:
+    """Return the identity of a record, or None if it has none of the key fields"""
+    for field in key_fields:
+        value = record.get(field)
+        if value is not None:
+            return f"{field}:{value}"
+    return None
+
+
+def record_fingerprint(record: Any) -> str:
+    """
+    Hash the normalized content of a record
+
+    The raw 'original' payload and unset (None) fields are left out so full
+    and compact snapshots compare equal when the normalized fields match.
+    """
+    data = {k: v for k, v in _as_dict(record).items() if k != 'original' and v is not None}
+    encoded = json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def diff_collection(previous: List[Any], current: List[Any], key_fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Compare two versions of one collection
+
+    Returns:
+        {'added': [...], 'changed': [...], 'removed': [...], 'unchanged': int}
+        where the lists hold record keys (e.g. 'id:42')
+    """
+    previous_hashes = {}
+    for record in previous:
+        key = record_key(record, key_fields)
+        if key is not None:
+            previous_hashes[key] = record_fingerprint(record)
+
+    added, changed = [], []
+    unchanged = 0
+    seen = set()
+    for record in current:
+        key = record_key(record, key_fields)
+        if key is None:
+            continue
+        seen.add(key)
+        if key not in previous_hashes:
+            added.append(key)
+        elif previous_hashes[key] != record_fingerprint(record):
+            changed.append(key)
+        else:
+            unchanged += 1
+
+    removed = [key for key in previous_hashes if key not in seen]
+    return {'added': added, 'changed': changed, 'removed': removed, 'unchanged': unchanged}
+
+
+def diff_configurations(previous: Dict[str, Any], current: Dict[str, Any], scoped: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare every known collection of two XIQ configurations
+
+    Collections missing from the current configuration (e.g. devices when
+    they were not requested) are skipped rather than reported as removed.
+
+    Args:
+        previous: Earlier configuration
+        current: Fresh configuration
+        scoped: current only holds part of each collection (a --network-policy-id
+                run); previous records it does not contain are out of scope, so
+                they are left out instead of being reported as removed
+
+    Returns:
+        Collection name -> diff_collection() result
+    """
+    diff = {}
+    for collection, key_fields in DIFF_COLLECTIONS.items():
+        if collection not in current:
+            continue
+        previous_records = previous.get(collection) or []
+        current_records = current[collection] or []
+        if scoped:
+            in_scope = {record_key(record, key_fields) for record in current_records}
+            previous_records = [record for record in previous_records if record_key(record, key_fields) in in_scope]
+        diff[collection] = diff_collection(previous_records, current_records, key_fields)
+    return diff
+
+
+def print_diff_summary(diff: Dict[str, Dict[str, Any]]):
+    """Print one line of churn per collection"""
+    for collection, result in diff.items():
+        print(f"  - {collection}: {len(result['added'])} added, {len(result['changed'])} changed, "
+              f"{len(result['removed'])} removed, {result['unchanged']} unchanged")
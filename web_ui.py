@@ -6,7 +6,6 @@ Provides a user-friendly web interface for the migration workflow
 
 import os
 import sys
-import json
 import threading
 from datetime import datetime
 from functools import wraps
@@ -21,6 +20,9 @@ from xiq_api_client import XIQAPIClient
 from campus_controller_client import CampusControllerClient
 from config_converter import ConfigConverter
 from pdf_report_generator import MigrationReportGenerator
+from json_codec import dump_file
+from token_cache import TokenCache
+from endpoint_cache import EndpointCache
 
 app = Flask(__name__)
 
@@ -46,6 +48,17 @@ REGION_URLS = {
     'California': 'https://api-ca.extremecloudiq.com'
 }
 
+# Opt-in encrypted XIQ token cache (XIQ_TOKEN_CACHE=1) - lets /api/connect_xiq reuse
+# the token issued at /login instead of authenticating a second time
+TOKEN_CACHE = TokenCache() if os.environ.get('XIQ_TOKEN_CACHE', '').lower() in ('1', 'true', 'yes') else None
+
+# Opt-in cache of the RADIUS endpoint that works for each tenant (XIQ_ENDPOINT_CACHE=1)
+ENDPOINT_CACHE = EndpointCache() if os.environ.get('XIQ_ENDPOINT_CACHE', '').lower() in ('1', 'true', 'yes') else None
+
+# Collections /api/connect_xiq fetches and returns by default (a 'collections' list in
+# the request narrows this); the others are fetched when the report or conversion needs them
+CONNECT_COLLECTIONS = ['ssids', 'vlans', 'authentication', 'devices']
+
 # Store migration state with thread safety
 migration_state = {
     'status': 'idle',  # idle, running, completed, error
@@ -145,14 +158,17 @@ def login():
         password = request.form.get('password')
         region = request.form.get('region', 'Global')
 
-        # Validate credentials by attempting XIQ authentication
+        # Validate credentials by attempting XIQ authentication - always a real /login,
+        # a cached token doesn't prove the password is still valid (the new token is cached)
         try:
             base_url = REGION_URLS.get(region, REGION_URLS['Global'])
             xiq_client = XIQAPIClient.login(
                 username=username,
                 password=password,
                 base_url=base_url,
-                verbose=False
+                verbose=False,
+                token_cache=TOKEN_CACHE,
+                use_cached_token=False
             )
 
             if xiq_client:
@@ -201,6 +217,8 @@ def connect_xiq():
         username = data.get('username')
         password = data.get('password')
         region = data.get('region', 'Global')
+        # Collections to fetch now; the rest are fetched when first needed
+        collections = [c for c in data.get('collections', CONNECT_COLLECTIONS) if c in CONNECT_COLLECTIONS]
 
         # Map region to base URL
         region_urls = {
@@ -219,7 +237,9 @@ def connect_xiq():
             username=username,
             password=password,
             base_url=base_url,
-            verbose=False
+            verbose=False,
+            token_cache=TOKEN_CACHE,
+            endpoint_cache=ENDPOINT_CACHE
         )
 
         if not xiq_client:
@@ -229,34 +249,31 @@ def connect_xiq():
         log_message('Successfully authenticated with XIQ')
         update_progress('Retrieving XIQ configuration', 30)
 
-        # Get complete configuration
-        log_message('Fetching configuration from XIQ...')
-        xiq_config = xiq_client.get_configuration()
-
-        log_message('Fetching device information...')
-        devices = xiq_client.get_devices()
-        xiq_config['devices'] = devices
-
-        # Extract data from configuration
-        ssids = xiq_config.get('ssids', [])
-        vlans = xiq_config.get('vlans', [])
-        radius_servers = xiq_config.get('authentication', [])
+        # Fetch the requested collections concurrently; the rest (including devices) are
+        # fetched lazily if the report or migration needs them later
+        log_message(f'Fetching {", ".join(collections)} from XIQ...')
+        xiq_config = xiq_client.get_lazy_configuration(include_devices=True).load(collections)
 
         # Store in session (thread-safe)
         with state_lock:
             migration_state['xiq_data'] = xiq_config
 
-        log_message(f'Retrieved {len(ssids)} SSIDs, {len(vlans)} VLANs, {len(radius_servers)} RADIUS servers, {len(devices)} devices')
+        result = {}
+        if 'ssids' in collections:
+            result['ssids'] = [{'id': s.get('id'), 'name': s.get('name', s.get('ssid_name', 'Unknown'))} for s in xiq_config['ssids']]
+        if 'vlans' in collections:
+            result['vlans'] = [{'id': v.get('id'), 'name': v.get('name', 'Unknown'), 'vlan_id': v.get('vlan_id')} for v in xiq_config['vlans']]
+        if 'authentication' in collections:
+            result['radius_servers'] = [{'id': r.get('id'), 'name': r.get('name', 'Unknown'), 'ip': r.get('ip', 'Unknown')} for r in xiq_config['authentication']]
+        if 'devices' in collections:
+            result['devices'] = [{'serial': d.get('serial_number', 'Unknown'), 'name': d.get('name', d.get('hostname', 'Unknown')), 'location': d.get('location', 'N/A')} for d in xiq_config['devices']]
+
+        log_message('Retrieved ' + ', '.join(f'{len(items)} {name.replace("_", " ")}' for name, items in result.items()))
         update_progress('XIQ data retrieved', 50)
 
         return jsonify({
             'success': True,
-            'data': {
-                'ssids': [{'id': s.get('id'), 'name': s.get('name', s.get('ssid_name', 'Unknown'))} for s in ssids],
-                'vlans': [{'id': v.get('id'), 'name': v.get('name', 'Unknown'), 'vlan_id': v.get('vlan_id')} for v in vlans],
-                'radius_servers': [{'id': r.get('id'), 'name': r.get('name', 'Unknown'), 'ip': r.get('ip', 'Unknown')} for r in radius_servers],
-                'devices': [{'serial': d.get('serial_number', 'Unknown'), 'name': d.get('name', d.get('hostname', 'Unknown')), 'location': d.get('location', 'N/A')} for d in devices]
-            }
+            'data': result
         })
 
     except Exception as e:
@@ -312,20 +329,20 @@ def connect_edge():
 
         log_message(f'Connecting to Edge Services at {controller_url}...')
 
-        # Initialize Edge Services client (authenticates automatically in __init__)
-        controller_client = CampusControllerClient(
+        # Initialize Edge Services client (authenticates automatically in __init__;
+        # closed on leaving the block, also on errors)
+        with CampusControllerClient(
             base_url=controller_url,
             username=username,
             password=password,
             verbose=False
-        )
+        ) as controller_client:
+            # If we get here, authentication succeeded (otherwise exception was thrown)
+            log_message('Successfully authenticated with Edge Services')
 
-        # If we get here, authentication succeeded (otherwise exception was thrown)
-        log_message('Successfully authenticated with Edge Services')
-
-        # Get profiles
-        log_message('Fetching Associated Profiles...')
-        profiles = controller_client.get_profiles()
+            # Get profiles
+            log_message('Fetching Associated Profiles...')
+            profiles = controller_client.get_profiles()
 
         # Sort profiles (custom first, then defaults) and cache
         custom_profiles = [p for p in profiles if '/default' not in p.get('name', '').lower()]
@@ -473,8 +490,7 @@ def migrate():
                 converted_config = migration_state['converted_config']
 
             output_file = '/tmp/migration_dry_run.json'
-            with open(output_file, 'w') as f:
-                json.dump(converted_config, f, indent=2)
+            dump_file(converted_config, output_file)
 
             log_message(f'Configuration saved to {output_file}')
             update_progress('Dry run complete', 100)
@@ -490,77 +506,67 @@ def migrate():
                 }
             })
 
-        # Initialize Edge Services client (authenticates automatically in __init__)
-        controller_client = CampusControllerClient(
+        # Initialize Edge Services client (authenticates automatically in __init__;
+        # closed on leaving the block, also on errors)
+        with CampusControllerClient(
             base_url=controller_url,
             username=username,
             password=password,
             verbose=False
-        )
-
-        # If we get here, authentication succeeded (otherwise exception was thrown)
-        log_message('Authenticated with Edge Services')
-
-        with state_lock:
-            campus_config = migration_state['converted_config'].copy()
+        ) as controller_client:
+            # If we get here, authentication succeeded (otherwise exception was thrown)
+            log_message('Authenticated with Edge Services')
 
-        # Update SSID status based on user preference
-        services_to_post = campus_config.get('services', [])
-        if ssid_status == 'enabled':
-            log_message(f'SSIDs will be ENABLED and broadcasting after migration ({len(services_to_post)} services)')
-            enabled_count = 0
-            for service in services_to_post:
-                service['status'] = 'enabled'
-                enabled_count += 1
-            log_message(f'Set {enabled_count} services to enabled status')
-        else:
-            log_message('SSIDs will be imported as DISABLED for manual review')
-            # Services are already disabled by default in config_converter
-
-        # Post configuration using unified method
-        log_message('Posting configuration to Edge Services...')
-        result = controller_client.post_configuration(campus_config)
-
-        # Extract results
-        results = result.get('details', {})
-
-        # If user wants SSIDs enabled, explicitly enable them after creation
-        if ssid_status == 'enabled' and results.get('services_created', 0) > 0:
-            log_message('Enabling SSIDs via PATCH requests to ensure they broadcast...')
-            enable_count = controller_client.enable_all_services()
-            log_message(f'Successfully enabled {enable_count} SSIDs')
-            results['ssids_enabled'] = enable_count
-
-        update_progress('Applying profile assignments', 90)
-
-        # Apply profile assignments
-        if profile_assignments:
-            log_message('Applying profile assignments...')
-            assignment_count = 0
-
-            for service_id, assignments in profile_assignments.items():
-                # Group by profile
-                profile_groups = {}
-                for assignment in assignments:
-                    profile_id = assignment['profile_id']
-                    if profile_id not in profile_groups:
-                        profile_groups[profile_id] = {
-                            'profile_name': assignment['profile_name'],
-                            'ssid_assignments': []
-                        }
-                    profile_groups[profile_id]['ssid_assignments'].append({
-                        'serviceId': service_id,
-                        'index': assignment['radio_index']
-                    })
-
-                # Apply assignments
-                for profile_id, group in profile_groups.items():
-                    log_message(f'Assigning to profile {group["profile_name"]}...')
-                    if controller_client.update_profile_ssid_assignments(profile_id, group['ssid_assignments']):
-                        assignment_count += len(group['ssid_assignments'])
-
-            log_message(f'Applied {assignment_count} profile assignments')
-            results['profile_assignments'] = assignment_count
+            with state_lock:
+                campus_config = migration_state['converted_config'].copy()
+
+            # Update SSID status based on user preference
+            services_to_post = campus_config.get('services', [])
+            if ssid_status == 'enabled':
+                log_message(f'SSIDs will be ENABLED and broadcasting after migration ({len(services_to_post)} services)')
+                enabled_count = 0
+                for service in services_to_post:
+                    service['status'] = 'enabled'
+                    enabled_count += 1
+                log_message(f'Set {enabled_count} services to enabled status')
+            else:
+                log_message('SSIDs will be imported as DISABLED for manual review')
+                # Services are already disabled by default in config_converter
+
+            # Post configuration using unified method
+            log_message('Posting configuration to Edge Services...')
+            result = controller_client.post_configuration(campus_config)
+
+            # Extract results
+            results = result.get('details', {})
+
+            # Services that already existed were adopted under their existing ids
+            id_map = result.get('id_map', {})
+            profile_assignments = {id_map.get(service_id, service_id): assignments
+                                   for service_id, assignments in profile_assignments.items()}
+            created_services = result.get('created', {}).get('services', [])
+
+            # Services were posted as enabled; PUT only those of this run's services the controller left disabled
+            # (ssids_enabled counts those PUTs)
+            if ssid_status == 'enabled' and created_services:
+                log_message('Checking that the created SSIDs are enabled...')
+                enable_count = controller_client.enable_all_services(service_ids=created_services)
+                if enable_count:
+                    log_message(f'Enabled {enable_count} SSIDs that were created disabled')
+                results['ssids_enabled'] = enable_count
+
+            update_progress('Applying profile assignments', 90)
+
+            # Apply profile assignments
+            if profile_assignments:
+                log_message('Applying profile assignments...')
+                # One GET + PUT per profile, covering every service assigned to it
+                plan = controller_client.plan_profile_assignments(profile_assignments)
+                log_message(f'Updating {len(plan)} profiles...')
+                assignment_count = controller_client.apply_profile_assignments(profile_assignments, plan=plan)
+
+                log_message(f'Applied {assignment_count} profile assignments')
+                results['profile_assignments'] = assignment_count
 
         with state_lock:
             migration_state['results'] = results